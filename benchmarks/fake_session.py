@@ -0,0 +1,107 @@
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Any, AsyncGenerator, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    CreateChatInviteLink,
+    GetChatMember,
+    GetMe,
+    SendMessage,
+    TelegramMethod,
+)
+from aiogram.methods.base import TelegramType
+from aiogram.types import Chat, ChatInviteLink, ChatMemberMember, Message, User
+
+BOT_ID = 42
+
+
+class FakeSession(BaseSession):
+    """네트워크 없이 Bot API 응답을 흉내내는 aiogram 세션.
+
+    호출마다 latency(±jitter)초 대기하고, flood_rate 확률로 429(retry_after초)를 낸다.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        flood_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: Optional[int] = None,
+    ):
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.floods = 0
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.floods = 0
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(
+        self, url: str, headers: Optional[dict] = None, timeout: int = 30,
+        chunk_size: int = 65536, raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None
+    ) -> TelegramType:
+        self.calls[type(method).__name__] += 1
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.flood_rate and self.random.random() < self.flood_rate:
+            self.floods += 1
+            raise TelegramRetryAfter(
+                method=method,
+                message=f"Too Many Requests: retry after {self.retry_after}",
+                retry_after=self.retry_after,
+            )
+        return self._response(method)
+
+    @staticmethod
+    def _response(method: TelegramMethod[Any]) -> Any:
+        if isinstance(method, GetMe):
+            return User(id=BOT_ID, is_bot=True, first_name="bench", username="bench_bot")
+        if isinstance(method, GetChatMember):
+            return ChatMemberMember(
+                user=User(
+                    id=method.user_id,
+                    is_bot=False,
+                    first_name="user",
+                    username=f"user{method.user_id}",
+                )
+            )
+        if isinstance(method, SendMessage):
+            return Message(
+                message_id=1,
+                date=datetime.now(),
+                chat=Chat(id=method.chat_id, type="supergroup"),
+                text=method.text,
+            )
+        if isinstance(method, CreateChatInviteLink):
+            return ChatInviteLink(
+                invite_link="https://t.me/+bench",
+                creator=User(id=BOT_ID, is_bot=True, first_name="bench"),
+                creates_join_request=False,
+                is_primary=False,
+                is_revoked=False,
+            )
+        return True
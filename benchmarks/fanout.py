@@ -0,0 +1,266 @@
+"""그룹 수별 차단/해제/강퇴 연동 벤치마크 (오프라인, 가짜 Bot API 세션).
+
+실제 핸들러(ban_user_cmd, unban_user_cmd)와 outbox 워커를 가짜 세션에 연결해
+명령 1회가 모든 그룹에 전파될 때까지의 지연(p50/p95/p99)과 작업당 API 호출/DB 쿼리 수를 잰다.
+강퇴는 명령 핸들러가 없어 outbox에 kick 작업을 넣고 워커 처리 시간을 잰다.
+
+    python -m benchmarks.fanout --groups 50,500,5000 --ops 5 --latency 0.02 --flood-rate 0.01
+"""
+import argparse
+import asyncio
+import logging
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# config는 import 시 환경 변수를 검사하고 bot.log/data를 현재 디렉터리에 만든다
+os.environ.setdefault("BOT_TOKEN", "42:benchmark")
+os.environ.setdefault("MASTER_ADMIN_IDS", "1")
+os.environ.setdefault("LOG_CHANNEL_ID", "-1000000000001")
+os.environ.setdefault("PUBLIC_LOG_CHANNEL_ID", "-1000000000002")
+os.environ.setdefault("OUTBOX_BATCH_SIZE", "5000")
+_workdir = tempfile.mkdtemp(prefix="okm3-bench-")
+os.chdir(_workdir)
+
+from aiogram import Bot, types  # noqa: E402
+
+from benchmarks.fake_session import FakeSession  # noqa: E402
+from database.connection import db  # noqa: E402
+from database.groups import load_registry  # noqa: E402
+from database.outbox import ACTION_KICK, enqueue_sync  # noqa: E402
+from database.setup import init_db  # noqa: E402
+from handlers.ban import ban_user_cmd, unban_user_cmd  # noqa: E402
+from handlers.sync_outbox import OutboxWorker  # noqa: E402
+from utils.cache import MemberCacheMiddleware, member_cache  # noqa: E402
+from utils.logger import log_digest  # noqa: E402
+from utils.retry import RetryMiddleware  # noqa: E402
+from utils.scheduler import ApiScheduler, RateLimitMiddleware  # noqa: E402
+from utils.storage import upsert_groups  # noqa: E402
+
+ADMIN_ID = 1
+ORIGIN_CHAT_ID = -1001000000000
+
+
+class QueryCounter:
+    """ConnectionManager의 execute/executemany/fetchall 호출 수 집계."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.originals: Dict[str, Callable] = {}
+
+    def install(self) -> None:
+        for name in ("execute", "executemany", "fetchall"):
+            original = getattr(db, name)
+            self.originals[name] = original
+            setattr(db, name, self._wrap(name, original))
+
+    def _wrap(self, name: str, original: Callable) -> Callable:
+        async def counted(*args: Any, **kwargs: Any) -> Any:
+            self.counts[name] += 1
+            return await original(*args, **kwargs)
+
+        return counted
+
+    def uninstall(self) -> None:
+        for name, original in self.originals.items():
+            setattr(db, name, original)
+        self.originals.clear()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    async def pending_jobs(self) -> int:
+        # 측정 대상이 아닌 조회는 원래 메서드로 실행
+        rows = await self.originals["fetchall"](
+            "SELECT COUNT(*) FROM sync_outbox WHERE status IN ('pending', 'running')"
+        )
+        return int(rows[0][0])
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """nearest-rank 백분위수."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def make_message(bot: Bot, text: str) -> types.Message:
+    return types.Message(
+        message_id=1,
+        date=datetime.now(),
+        chat=types.Chat(id=ORIGIN_CHAT_ID, type="supergroup", title="bench"),
+        from_user=types.User(id=ADMIN_ID, is_bot=False, first_name="admin", username="admin"),
+        text=text,
+    ).as_(bot)
+
+
+async def wait_drained(counter: QueryCounter, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while await counter.pending_jobs():
+        if time.monotonic() > deadline:
+            raise TimeoutError("outbox did not drain")
+        await asyncio.sleep(0.005)
+
+
+async def run_case(
+    group_count: int, ops: int, users_per_op: int, args: argparse.Namespace
+) -> List[Dict[str, Any]]:
+    db.path = os.path.join(_workdir, f"bench-{group_count}.db")
+    await db.start()
+    await init_db()
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    groups = {ORIGIN_CHAT_ID: {"title": "bench", "admin_id": ADMIN_ID, "added_at": now}}
+    groups.update(
+        {
+            -1002000000000 - i: {"title": f"group{i}", "admin_id": ADMIN_ID, "added_at": now}
+            for i in range(group_count - 1)
+        }
+    )
+    await upsert_groups(groups)
+    await load_registry()
+    member_cache.clear()
+
+    session = FakeSession(
+        latency=args.latency,
+        jitter=args.jitter,
+        flood_rate=args.flood_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    bot = Bot("42:benchmark", session=session)
+    scheduler = ApiScheduler(global_rate=args.global_rate, global_burst=args.global_rate)
+    bot.session.middleware(RetryMiddleware(scheduler))
+    bot.session.middleware(RateLimitMiddleware(scheduler))
+    bot.session.middleware(MemberCacheMiddleware(member_cache))
+    await scheduler.start()
+    counter = QueryCounter()
+    counter.install()
+    worker = OutboxWorker(bot, poll_interval=0.05)
+    await worker.start()
+
+    async def ban_op(user_ids: List[int]) -> None:
+        await ban_user_cmd(
+            make_message(bot, ".ban " + " ".join(map(str, user_ids)) + " bench"), bot
+        )
+
+    async def unban_op(user_ids: List[int]) -> None:
+        # 운영에서는 ban.router가 먼저 등록되어 handlers.ban의 .unban이 처리한다
+        await unban_user_cmd(
+            make_message(bot, ".unban " + " ".join(map(str, user_ids)) + " bench"), bot
+        )
+
+    async def kick_op(user_ids: List[int]) -> None:
+        await enqueue_sync(
+            ACTION_KICK,
+            list(groups),
+            [(f"user{user_id}", user_id) for user_id in user_ids],
+            "bench",
+            "bench",
+        )
+
+    results = []
+    try:
+        for action, operation in (("ban", ban_op), ("unban", unban_op), ("kick", kick_op)):
+            handler_times: List[float] = []
+            total_times: List[float] = []
+            session.reset()
+            counter.counts.clear()
+            for op in range(ops):
+                user_ids = [
+                    1_000_000 + op * users_per_op + i for i in range(users_per_op)
+                ]
+                started = time.perf_counter()
+                await operation(user_ids)
+                handler_times.append(time.perf_counter() - started)
+                await wait_drained(counter, args.timeout)
+                await log_digest.flush()
+                total_times.append(time.perf_counter() - started)
+            results.append(
+                {
+                    "groups": group_count,
+                    "action": action,
+                    "ops": ops,
+                    "handler": handler_times,
+                    "total": total_times,
+                    "api_calls": session.total_calls / ops,
+                    "db_queries": counter.total / ops,
+                    "floods": session.floods,
+                }
+            )
+    finally:
+        await worker.stop()
+        await scheduler.stop()
+        counter.uninstall()
+        await db.close()
+        await bot.session.close()
+    return results
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    header = (
+        f"{'groups':>6} {'action':<6} {'ops':>4} "
+        f"{'cmd p50':>9} {'p50':>9} {'p95':>9} {'p99':>9} "
+        f"{'api/op':>9} {'db/op':>8} {'429s':>5}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['groups']:>6} {row['action']:<6} {row['ops']:>4} "
+            f"{percentile(row['handler'], 50):>8.3f}s "
+            f"{percentile(row['total'], 50):>8.3f}s "
+            f"{percentile(row['total'], 95):>8.3f}s "
+            f"{percentile(row['total'], 99):>8.3f}s "
+            f"{row['api_calls']:>9.1f} {row['db_queries']:>8.1f} {row['floods']:>5}"
+        )
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        epilog="채팅별 메시지 한도(API_CHAT_RATE/BURST)는 설정값 그대로 적용된다.",
+    )
+    parser.add_argument("--groups", default="50,500", help="쉼표로 구분한 그룹 수")
+    parser.add_argument("--ops", type=int, default=5, help="동작별 반복 횟수")
+    parser.add_argument("--users", type=int, default=1, help="명령당 대상 사용자 수")
+    parser.add_argument("--latency", type=float, default=0.02, help="API 호출 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.005, help="지연 편차(초)")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="429 발생 확률")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 retry_after(초)")
+    parser.add_argument(
+        "--global-rate", type=float, default=1000.0, help="전역 API 속도 제한(초당)"
+    )
+    parser.add_argument("--timeout", type=float, default=600.0, help="전파 대기 한도(초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="봇 로그 출력")
+    return parser.parse_args(argv)
+
+
+async def main(argv: List[str]) -> None:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.ERROR)
+    results: List[Dict[str, Any]] = []
+    try:
+        for group_count in (int(value) for value in args.groups.split(",")):
+            results.extend(await run_case(group_count, args.ops, args.users, args))
+    finally:
+        shutil.rmtree(_workdir, ignore_errors=True)
+    print_report(results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -4,6 +4,9 @@ from dotenv import load_dotenv
 import structlog
 import logging
 
+from utils.log_queue import setup_queue_logging
+from utils.log_sampling import EventSampler, parse_event_budgets
+
 load_dotenv('c:/abb/.env')
 
 BOT_TOKEN: str = os.getenv("BOT_TOKEN") or ""
@@ -28,15 +31,117 @@ def get_channel_id(key: str) -> int:
 LOG_CHANNEL_ID = get_channel_id("LOG_CHANNEL_ID")
 PUBLIC_LOG_CHANNEL_ID = get_channel_id("PUBLIC_LOG_CHANNEL_ID")
 
+# 업데이트 수신 방식: polling 또는 webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling").strip().lower()
+if BOT_MODE not in ("polling", "webhook"):
+    raise ValueError(f"BOT_MODE는 polling 또는 webhook이어야 합니다: {BOT_MODE}")
+
+# 웹훅 모드 설정 (WEBHOOK_URL은 외부에서 접근 가능한 https 주소)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").rstrip("/")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+if BOT_MODE == "webhook" and not WEBHOOK_URL:
+    raise ValueError("웹훅 모드에는 WEBHOOK_URL 환경 변수가 필요합니다.")
+
+# 이벤트 루프 지연 감시 (측정 주기 초 / 멈춤으로 볼 지연 초, 주기 0이면 비활성화)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.25"))
+
+# /metrics 엔드포인트 (포트 0이면 비활성화)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
 DATA_DIR = "data"
 GROUPS_FILE = os.path.join(DATA_DIR, "groups.json")
 BANNED_USERS_FILE = os.path.join(DATA_DIR, "banned_users.json")
 ADMINS_FILE = os.path.join(DATA_DIR, "admins.json")
+KICKED_USERS_FILE = os.path.join(DATA_DIR, "kicked_users.json")
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# 명령 단위 span 추적 (TRACE_SLOW_MS 이상 걸린 trace는 모두, 나머지는 표본 비율만 기록)
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(DATA_DIR, "traces.jsonl"))
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "2000"))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "2000"))
+
+# SQLite 설정 (WAL 모드, 연결별 PRAGMA, 체크포인트 주기 초)
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_CHECKPOINT_INTERVAL = float(os.getenv("DB_CHECKPOINT_INTERVAL", "300"))
+# 시작 시 무결성 검사: quick, full, off
+DB_INTEGRITY_CHECK = os.getenv("DB_INTEGRITY_CHECK", "quick").lower()
+
+# Bot API 호출 속도 제한 (초당 요청 수 / 버스트)
+API_GLOBAL_RATE = float(os.getenv("API_GLOBAL_RATE", "30"))
+API_GLOBAL_BURST = int(os.getenv("API_GLOBAL_BURST", "30"))
+API_CHAT_RATE = float(os.getenv("API_CHAT_RATE", "0.33"))
+API_CHAT_BURST = int(os.getenv("API_CHAT_BURST", "3"))
+
+# Bot API 재시도 (지수 백오프, 초 단위)
+API_RETRY_ATTEMPTS = int(os.getenv("API_RETRY_ATTEMPTS", "5"))
+API_RETRY_BASE_DELAY = float(os.getenv("API_RETRY_BASE_DELAY", "0.5"))
+API_RETRY_MAX_DELAY = float(os.getenv("API_RETRY_MAX_DELAY", "30"))
+
+# 로그 채널 메시지 묶음 전송 주기 (초, 0이면 즉시 전송)
+LOG_DIGEST_WINDOW = float(os.getenv("LOG_DIGEST_WINDOW", "5"))
+
+# 명령어 속도 제한 (window초 동안 사용자별/채팅별 최대 명령 수)
+THROTTLE_WINDOW = float(os.getenv("THROTTLE_WINDOW", "10"))
+THROTTLE_USER_LIMIT = int(os.getenv("THROTTLE_USER_LIMIT", "5"))
+THROTTLE_CHAT_LIMIT = int(os.getenv("THROTTLE_CHAT_LIMIT", "20"))
+THROTTLE_MAX_KEYS = int(os.getenv("THROTTLE_MAX_KEYS", "100000"))
+
+# 채팅 멤버 조회 캐시 (TTL 초 / 최대 항목 수)
+MEMBER_CACHE_TTL = float(os.getenv("MEMBER_CACHE_TTL", "300"))
+MEMBER_CACHE_SIZE = int(os.getenv("MEMBER_CACHE_SIZE", "10000"))
+
+# 사용자명 → ID 메모리 캐시 최대 항목 수
+USERNAME_CACHE_SIZE = int(os.getenv("USERNAME_CACHE_SIZE", "50000"))
+# 사용자명 캐시 쓰기 지연 (초 / 즉시 저장할 누적 건수)
+USERNAME_FLUSH_INTERVAL = float(os.getenv("USERNAME_FLUSH_INTERVAL", "5"))
+USERNAME_FLUSH_SIZE = int(os.getenv("USERNAME_FLUSH_SIZE", "200"))
+# 메시지에서 수집한 사용자 정보 저장 한도 (초당 변경 건수)
+HARVEST_MAX_WRITES_PER_SECOND = float(os.getenv("HARVEST_MAX_WRITES_PER_SECOND", "50"))
+
+# 그룹 × 사용자 연동 실행 동시성 (전체 / 그룹별)
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "16"))
+FANOUT_PER_GROUP = int(os.getenv("FANOUT_PER_GROUP", "4"))
+
+# 그룹 간 연동 작업 큐 (outbox)
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+# 일시적 실패 후 재시도 대기 (지수 백오프 기준 / 상한, 초)
+OUTBOX_RETRY_BASE_DELAY = float(os.getenv("OUTBOX_RETRY_BASE_DELAY", "5"))
+OUTBOX_RETRY_MAX_DELAY = float(os.getenv("OUTBOX_RETRY_MAX_DELAY", "600"))
+
+# 기간 차단 만료 처리 (메모리에 올릴 만료 예정 건수 / 오류 후 재시도 대기 초)
+BAN_EXPIRY_BATCH_SIZE = int(os.getenv("BAN_EXPIRY_BATCH_SIZE", "500"))
+BAN_EXPIRY_RETRY_DELAY = float(os.getenv("BAN_EXPIRY_RETRY_DELAY", "30"))
+
+# 자주 발생하는 info 이벤트 제한 (이벤트=초당 건수/s 또는 이벤트=표본 비율)
+LOG_EVENT_BUDGETS = os.getenv(
+    "LOG_EVENT_BUDGETS",
+    "is_admin_check=5/s,is_group_admin_check=5/s,permission_check=5/s,"
+    "reply_sent=5/s,log_sent=2/s",
+)
+# 제한으로 버린 이벤트 수를 기록하는 주기 (초)
+LOG_SUPPRESSED_REPORT_INTERVAL = float(os.getenv("LOG_SUPPRESSED_REPORT_INTERVAL", "60"))
+
+log_sampler = EventSampler(
+    parse_event_budgets(LOG_EVENT_BUDGETS), LOG_SUPPRESSED_REPORT_INTERVAL
+)
+
 structlog.configure(
     processors=[
+        log_sampler,
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.stdlib.add_log_level,
         structlog.processors.JSONRenderer(),
@@ -47,10 +152,20 @@ structlog.configure(
     cache_logger_on_first_use=True,
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-    handlers=[logging.FileHandler("bot.log"), logging.StreamHandler()],
+# 로그 파일 (크기 기준 회전, 회전된 파일은 gzip 압축 / 큐가 가득 차면 버림)
+LOG_FILE = os.getenv("LOG_FILE", "bot.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# 파일/콘솔 기록은 백그라운드 스레드에서 처리 (이벤트 루프는 큐에 넣기만 한다)
+log_queue_handler = setup_queue_logging(
+    LOG_FILE,
+    level=logging.getLevelName(LOG_LEVEL),
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+    queue_size=LOG_QUEUE_SIZE,
 )
 logger = structlog.get_logger()
 
@@ -0,0 +1,238 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+import aiosqlite
+
+from config import (
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHE_SIZE_KB,
+    DB_CHECKPOINT_INTERVAL,
+    DB_MMAP_SIZE,
+    DB_SYNCHRONOUS,
+    logger,
+)
+from utils.metrics import DB_DURATION, statement_label
+from utils.tracing import tracer
+
+DATABASE = "data/bot.db"
+READ_POOL_SIZE = 3
+STATEMENT_CACHE_SIZE = 256
+
+# 모든 연결에 적용하는 PRAGMA (journal_mode=WAL은 DB 파일에 유지된다)
+CONNECTION_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", DB_SYNCHRONOUS),
+    ("cache_size", -DB_CACHE_SIZE_KB),
+    ("mmap_size", DB_MMAP_SIZE),
+    ("busy_timeout", DB_BUSY_TIMEOUT_MS),
+    ("temp_store", "MEMORY"),
+)
+
+
+class ConnectionManager:
+    """쓰기 연결 1개와 읽기 연결 풀을 유지하는 SQLite 연결 관리자."""
+
+    def __init__(
+        self,
+        path: str = DATABASE,
+        read_pool_size: int = READ_POOL_SIZE,
+        statement_cache_size: int = STATEMENT_CACHE_SIZE,
+        checkpoint_interval: float = DB_CHECKPOINT_INTERVAL,
+    ):
+        self.path = path
+        self.read_pool_size = read_pool_size
+        self.statement_cache_size = statement_cache_size
+        self.checkpoint_interval = checkpoint_interval
+        self._checkpoint_task: Optional[asyncio.Task] = None
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._read_pool: Optional["asyncio.Queue[aiosqlite.Connection]"] = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._writer is not None
+
+    async def _connect(self) -> aiosqlite.Connection:
+        # isolation_level=None: 트랜잭션은 transaction()에서 명시적으로 연다.
+        # cached_statements: 연결별 prepared statement 캐시 크기
+        conn = await aiosqlite.connect(
+            self.path,
+            isolation_level=None,
+            cached_statements=self.statement_cache_size,
+        )
+        for name, value in CONNECTION_PRAGMAS:
+            await conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    async def _read_pragmas(self, conn: aiosqlite.Connection) -> dict:
+        settings = {}
+        for name, _ in CONNECTION_PRAGMAS:
+            cursor = await conn.execute(f"PRAGMA {name}")
+            row = await cursor.fetchone()
+            await cursor.close()
+            settings[name] = row[0] if row else None
+        return settings
+
+    async def start(self) -> None:
+        """연결 열기."""
+        async with self._start_lock:
+            if self.started:
+                return
+            self._writer = await self._connect()
+            self._read_pool = asyncio.Queue()
+            for _ in range(self.read_pool_size):
+                conn = await self._connect()
+                self._readers.append(conn)
+                self._read_pool.put_nowait(conn)
+            if self.checkpoint_interval > 0:
+                self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+            logger.info(
+                "db_pool_started",
+                db_path=self.path,
+                read_pool_size=self.read_pool_size,
+                checkpoint_interval=self.checkpoint_interval,
+                **await self._read_pragmas(self._writer),
+            )
+
+    async def close(self) -> None:
+        """모든 연결 닫기."""
+        if not self.started:
+            return
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            await asyncio.gather(self._checkpoint_task, return_exceptions=True)
+            self._checkpoint_task = None
+        # 종료 시 WAL 내용을 DB 파일로 옮기고 WAL 파일을 비운다
+        await self.checkpoint("TRUNCATE")
+        async with self._start_lock:
+            if not self.started:
+                return
+            async with self._write_lock:
+                # 새 대여는 막고, 사용 중인 읽기 연결이 모두 반납될 때까지 기다린 뒤 닫는다
+                pool, self._read_pool = self._read_pool, None
+                if pool is not None:
+                    for _ in range(len(self._readers)):
+                        await pool.get()
+                for conn in self._readers:
+                    await conn.close()
+                self._readers.clear()
+                assert self._writer is not None
+                await self._writer.close()
+                self._writer = None
+            logger.info("db_pool_closed", db_path=self.path)
+
+    def _require_started(self) -> None:
+        # 종료 후 늦게 들어온 쿼리가 풀을 다시 열지 않도록 암묵적 시작은 하지 않는다
+        if not self.started:
+            raise RuntimeError(f"DB 연결이 시작되지 않았습니다: {self.path}")
+
+    async def checkpoint(self, mode: str = "PASSIVE") -> None:
+        """WAL 체크포인트 실행. PASSIVE는 읽기/쓰기를 막지 않는다."""
+        try:
+            async with self.writer() as conn:
+                cursor = await conn.execute(f"PRAGMA wal_checkpoint({mode})")
+                row = await cursor.fetchone()
+                await cursor.close()
+            busy, log_frames, checkpointed = row if row else (None, None, None)
+            logger.info(
+                "db_checkpoint",
+                mode=mode,
+                busy=busy,
+                wal_frames=log_frames,
+                checkpointed_frames=checkpointed,
+            )
+        except Exception as e:
+            logger.error("db_checkpoint_failed", mode=mode, error=str(e))
+
+    async def _checkpoint_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await self.checkpoint()
+
+    async def integrity_check(self, full: bool = False) -> List[str]:
+        """무결성 검사 결과 반환. 정상이면 ["ok"]."""
+        pragma = "integrity_check" if full else "quick_check"
+        rows = await self.fetchall(f"PRAGMA {pragma}")
+        return [str(row[0]) for row in rows]
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """쓰기 연결 독점 사용 (자동 커밋 모드). start() 이후에만 사용 가능."""
+        self._require_started()
+        async with self._write_lock:
+            # 잠금 대기 중에 close()가 끝났을 수 있다
+            self._require_started()
+            assert self._writer is not None
+            yield self._writer
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """쓰기 연결에서 단일 트랜잭션 실행. 예외 시 롤백."""
+        async with self.writer() as conn:
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            await conn.commit()
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """읽기 풀에서 연결 대여. start() 이후에만 사용 가능."""
+        self._require_started()
+        pool = self._read_pool
+        if pool is None:
+            # close()가 읽기 풀을 정리하는 중
+            raise RuntimeError(f"DB 연결이 닫히는 중입니다: {self.path}")
+        conn = await pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put_nowait(conn)
+
+    @staticmethod
+    @contextmanager
+    def _measure(query: str) -> Iterator[None]:
+        """문장별 실행 시간 지표와 trace span 기록."""
+        label = statement_label(query)
+        started = time.perf_counter()
+        try:
+            with tracer.span("db", statement=label):
+                yield
+        finally:
+            DB_DURATION.observe(time.perf_counter() - started, statement=label)
+
+    async def execute(self, query: str, params: Iterable[Any] = ()) -> int:
+        """쓰기 쿼리 실행 후 변경된 행 수 반환."""
+        with self._measure(query):
+            async with self.writer() as conn:
+                cursor = await conn.execute(query, tuple(params))
+                rowcount = cursor.rowcount
+                await cursor.close()
+                return rowcount
+
+    async def executemany(self, query: str, rows: Iterable[Iterable[Any]]) -> None:
+        batch = [tuple(row) for row in rows]
+        if not batch:
+            return
+        with self._measure(query):
+            async with self.transaction() as conn:
+                await conn.executemany(query, batch)
+
+    async def fetchall(
+        self, query: str, params: Iterable[Any] = ()
+    ) -> List[Tuple[Any, ...]]:
+        with self._measure(query):
+            async with self.reader() as conn:
+                cursor = await conn.execute(query, tuple(params))
+                rows = await cursor.fetchall()
+                await cursor.close()
+                return [tuple(row) for row in rows]
+
+
+db = ConnectionManager()
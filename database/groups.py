@@ -1,56 +1,105 @@
 from datetime import datetime  # datetime 임포트 추가
-from typing import Dict
+from typing import Dict, Iterator, List, Optional
 
 from config import logger
-from utils.storage import load_groups, save_groups
+from utils.storage import delete_groups, load_groups, update_groups_muted, upsert_groups
 
+# 프로세스 전역 그룹 레지스트리 (DB write-through 캐시)
+_registry: Dict[int, Dict] = {}
+_loaded = False
 
-async def get_groups() -> Dict[str, Dict]:
-    """그룹 데이터를 로드."""
-    return await load_groups()
 
+async def load_registry() -> None:
+    """DB에서 그룹 레지스트리를 한 번 로드."""
+    global _loaded
+    groups = await load_groups()
+    _registry.clear()
+    _registry.update(groups)
+    _loaded = True
+    logger.info("group_registry_loaded", group_count=len(_registry))
 
-async def save_groups(groups: Dict[str, Dict]) -> None:
-    """그룹 데이터를 저장."""
-    await save_groups(groups)
+
+async def _ensure_loaded() -> None:
+    if not _loaded:
+        await load_registry()
+
+
+async def get_groups() -> Dict[int, Dict]:
+    """그룹 데이터를 로드 (레지스트리 사본)."""
+    await _ensure_loaded()
+    return {chat_id: dict(data) for chat_id, data in _registry.items()}
+
+
+async def get_group(chat_id: int) -> Optional[Dict]:
+    """단일 그룹 조회 (O(1))."""
+    await _ensure_loaded()
+    group = _registry.get(chat_id)
+    return dict(group) if group is not None else None
+
+
+async def save_groups(groups: Dict[int, Dict]) -> None:
+    """그룹 데이터를 저장 (전달된 행만 기록)."""
+    await upsert_groups(groups)
+    for chat_id, data in groups.items():
+        _registry[chat_id] = dict(data)
+
+
+def is_muted(chat_id: int) -> bool:
+    """레지스트리 기준 음소거 여부 (O(1))."""
+    return _registry.get(chat_id, {}).get("muted", False)
+
+
+def iter_group_ids(exclude: Optional[int] = None) -> Iterator[int]:
+    """등록된 그룹 ID 순회 (exclude 제외)."""
+    for group_id in list(_registry):
+        if group_id != exclude:
+            yield group_id
+
+
+async def get_target_group_ids(exclude: Optional[int] = None) -> List[int]:
+    """연동 대상 그룹 ID 목록 (레지스트리 미로드 시 로드)."""
+    await _ensure_loaded()
+    return list(iter_group_ids(exclude))
 
 
 async def get_notification_status(chat_id: int) -> bool:
     """그룹의 알림 상태 확인 (음소거 여부)."""
-    groups = await get_groups()
-    return not groups.get(str(chat_id), {}).get("muted", False)
+    await _ensure_loaded()
+    return not is_muted(chat_id)
 
 
 async def set_mute_status(chat_id: int, muted: bool) -> None:
     """그룹의 음소거 상태 설정."""
-    groups = await get_groups()
-    if str(chat_id) not in groups:
-        groups[str(chat_id)] = {"muted": False}
-    groups[str(chat_id)]["muted"] = muted
-    await save_groups(groups)
+    await _ensure_loaded()
+    await update_groups_muted([chat_id], muted)
+    _registry.setdefault(chat_id, {"title": "", "admin_id": 0, "added_at": ""})[
+        "muted"
+    ] = muted
     logger.info("set_mute_status", chat_id=chat_id, muted=muted)
 
 
 async def set_all_mute_status(muted: bool) -> None:
     """모든 그룹의 음소거 상태 설정."""
-    groups = await get_groups()
-    for chat_id in groups:
-        groups[chat_id]["muted"] = muted
-    await save_groups(groups)
-    logger.info("set_all_mute_status", muted=muted, group_count=len(groups))
+    await _ensure_loaded()
+    chat_ids = list(_registry)
+    await update_groups_muted(chat_ids, muted)
+    for chat_id in chat_ids:
+        _registry[chat_id]["muted"] = muted
+    logger.info("set_all_mute_status", muted=muted, group_count=len(chat_ids))
 
 
 async def add_group(chat_id: int, title: str, admin_id: int) -> bool:
     """그룹 추가."""
     try:
-        groups = await get_groups()
-        groups[str(chat_id)] = {
+        await _ensure_loaded()
+        group = {
             "title": title,
             "admin_id": admin_id,
             "added_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "muted": groups.get(str(chat_id), {}).get("muted", False),
+            "muted": is_muted(chat_id),
         }
-        await save_groups(groups)
+        await upsert_groups({chat_id: group})
+        _registry[chat_id] = group
         logger.info("add_group_success", chat_id=chat_id, title=title)
         return True
     except Exception as e:
@@ -61,10 +110,10 @@ async def add_group(chat_id: int, title: str, admin_id: int) -> bool:
 async def remove_group(chat_id: int) -> bool:
     """그룹 제거."""
     try:
-        groups = await get_groups()
-        if str(chat_id) in groups:
-            del groups[str(chat_id)]
-            await save_groups(groups)
+        await _ensure_loaded()
+        if chat_id in _registry:
+            await delete_groups([chat_id])
+            del _registry[chat_id]
             logger.info("remove_group_success", chat_id=chat_id)
             return True
         logger.warning("remove_group_not_found", chat_id=chat_id)
@@ -0,0 +1,150 @@
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Tuple
+
+import aiofiles
+
+from config import ADMINS_FILE, BANNED_USERS_FILE, KICKED_USERS_FILE, logger
+from utils.storage import upsert_admins, upsert_banned_users, upsert_kicked_users
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 500
+MIGRATED_SUFFIX = ".migrated"
+# 최상위 객체에서 값 뒤에 올 수 있는 문자
+VALUE_DELIMITERS = ",} \t\r\n"
+
+_decoder = json.JSONDecoder()
+
+
+def _skip_ws(buffer: str, pos: int) -> int:
+    while pos < len(buffer) and buffer[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+async def iter_json_object(path: str) -> AsyncIterator[Tuple[str, Any]]:
+    """최상위 JSON 객체의 (키, 값) 쌍을 파일 전체를 올리지 않고 순회."""
+    async with aiofiles.open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+        state = "start"
+        key = ""
+
+        while True:
+            pos = _skip_ws(buffer, pos)
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f"{path}: 예상치 못한 파일 끝")
+                chunk = await f.read(CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            char = buffer[pos]
+            if state == "start":
+                if char != "{":
+                    raise ValueError(f"{path}: 최상위 값이 객체가 아닙니다")
+                pos += 1
+                state = "first_key"
+            elif state in ("first_key", "key"):
+                if state == "first_key" and char == "}":
+                    return
+                try:
+                    key, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    chunk = await f.read(CHUNK_SIZE)
+                    eof = not chunk
+                    buffer = buffer[pos:] + chunk
+                    pos = 0
+                    continue
+                pos = end
+                state = "colon"
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"{path}: ':' 누락 (key={key})")
+                pos += 1
+                state = "value"
+            elif state == "value":
+                try:
+                    value, end = _decoder.raw_decode(buffer, pos)
+                    # 숫자/리터럴은 잘린 채로도 해석되므로 ('-1.' → -1) 뒤에 구분자가
+                    # 보일 때만 완료로 본다. 문자열/객체/배열은 닫는 문자로 끝난다.
+                    incomplete = (
+                        not eof
+                        and buffer[pos] not in '"{['
+                        and (end >= len(buffer) or buffer[end] not in VALUE_DELIMITERS)
+                    )
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    incomplete = True
+                if incomplete:
+                    chunk = await f.read(CHUNK_SIZE)
+                    eof = not chunk
+                    buffer = buffer[pos:] + chunk
+                    pos = 0
+                    continue
+                pos = end
+                state = "separator"
+                yield key, value
+            elif state == "separator":
+                if char == "}":
+                    return
+                if char != ",":
+                    raise ValueError(f"{path}: ',' 누락 (key={key})")
+                pos += 1
+                state = "key"
+
+
+def _admin_row(data: Dict) -> Dict:
+    # JSON 저장소는 added_by_id 키를 사용했다.
+    return {
+        "username": data.get("username", ""),
+        "added_by": data.get("added_by_id", data.get("added_by", 0)),
+        "added_by_username": data.get("added_by_username", ""),
+        "timestamp": data.get("timestamp", ""),
+    }
+
+
+async def _import_file(
+    path: str,
+    upsert: Callable[[Dict[int, Dict]], Awaitable[None]],
+    transform: Callable[[Dict], Dict] = dict,
+) -> int:
+    batch: Dict[int, Dict] = {}
+    total = 0
+    async for key, value in iter_json_object(path):
+        if not isinstance(value, dict) or not str(key).lstrip("-").isdigit():
+            logger.warning("legacy_import_skipped_row", path=path, key=key)
+            continue
+        batch[int(key)] = transform(value)
+        if len(batch) >= BATCH_SIZE:
+            await upsert(batch)
+            total += len(batch)
+            batch = {}
+    if batch:
+        await upsert(batch)
+        total += len(batch)
+    return total
+
+
+async def import_legacy_json() -> None:
+    """기존 JSON 저장소를 SQLite로 한 번 이관. 완료된 파일은 .migrated로 이름 변경."""
+    sources = [
+        (BANNED_USERS_FILE, upsert_banned_users, dict),
+        (ADMINS_FILE, upsert_admins, _admin_row),
+        (KICKED_USERS_FILE, upsert_kicked_users, dict),
+    ]
+    for path, upsert, transform in sources:
+        if not os.path.exists(path):
+            continue
+        try:
+            count = await _import_file(path, upsert, transform)
+            os.replace(path, path + MIGRATED_SUFFIX)
+            logger.info("legacy_import_success", path=path, row_count=count)
+        except Exception as e:
+            logger.error("legacy_import_failed", path=path, error=str(e))
@@ -0,0 +1,278 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import aiosqlite
+
+from config import logger
+from database.connection import db
+
+Migration = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+async def _add_missing_columns(
+    conn: aiosqlite.Connection, table: str, columns: Dict[str, str]
+) -> None:
+    """기존 테이블에 없는 컬럼 추가."""
+    cursor = await conn.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in await cursor.fetchall()}
+    await cursor.close()
+    for name, column_type in columns.items():
+        if name not in existing:
+            await conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+            logger.info("db_column_added", table=table, column=name)
+
+
+async def _count(conn: aiosqlite.Connection, table: str) -> int:
+    cursor = await conn.execute(f"SELECT COUNT(*) FROM {table}")
+    row = await cursor.fetchone()
+    await cursor.close()
+    return int(row[0]) if row else 0
+
+
+def _integer_key(key: str) -> str:
+    """키 전체가 정수(선택적 '-' + 숫자)인지 검사하는 SQL 조건. '12abc'는 제외."""
+    value = f"trim({key})"
+    digits = f"CASE WHEN substr({value}, 1, 1) = '-' THEN substr({value}, 2) ELSE {value} END"
+    return f"({digits}) != '' AND ({digits}) NOT GLOB '*[^0-9]*'"
+
+
+async def _rebuild_table(
+    conn: aiosqlite.Connection, table: str, ddl: str, key: str, columns: List[str]
+) -> None:
+    """정수 키 테이블로 재작성. 정수가 아닌 키를 가진 행은 버리고 기록한다."""
+    before = await _count(conn, table)
+    condition = _integer_key(key)
+    cursor = await conn.execute(f"SELECT {key} FROM {table} WHERE NOT ({condition})")
+    invalid = [row[0] for row in await cursor.fetchall()]
+    await cursor.close()
+    if invalid:
+        logger.warning(
+            "db_rows_discarded",
+            table=table,
+            key=key,
+            count=len(invalid),
+            values=[str(value) for value in invalid[:20]],
+        )
+    await conn.execute(f"CREATE TABLE {table}_new ({ddl})")
+    other = [column for column in columns if column != key]
+    await conn.execute(
+        f"INSERT OR REPLACE INTO {table}_new ({key}, {', '.join(other)}) "
+        f"SELECT CAST(trim({key}) AS INTEGER), {', '.join(other)} FROM {table} "
+        f"WHERE {condition}"
+    )
+    after = await _count(conn, f"{table}_new")
+    await conn.execute(f"DROP TABLE {table}")
+    await conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    # 유효한 키끼리 겹친 행(' 12'와 '12')은 마지막 행만 남는다
+    logger.info(
+        "db_table_rebuilt",
+        table=table,
+        rows=after,
+        dropped_rows=before - after,
+        invalid_rows=len(invalid),
+        merged_rows=before - after - len(invalid),
+    )
+
+
+async def initial_schema(conn: aiosqlite.Connection) -> None:
+    """기존 테이블 생성 (버전 관리 이전 DB와 호환)."""
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS groups (
+            chat_id TEXT PRIMARY KEY,
+            title TEXT,
+            added_by INTEGER,
+            added_at TEXT,
+            notification BOOLEAN
+        )
+    """
+    )
+    for table in ("banned_users", "kicked_users"):
+        await conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                user_id TEXT PRIMARY KEY,
+                username TEXT,
+                admin_id INTEGER,
+                admin_username TEXT,
+                reason TEXT,
+                chat_id INTEGER,
+                timestamp TEXT
+            )
+        """
+        )
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS admins (
+            admin_id TEXT PRIMARY KEY,
+            username TEXT,
+            added_by_id INTEGER,
+            added_by_username TEXT,
+            timestamp TEXT
+        )
+    """
+    )
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS username_cache (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            first_name TEXT,
+            last_name TEXT
+        )
+    """
+    )
+    await _add_missing_columns(
+        conn, "username_cache", {"first_name": "TEXT", "last_name": "TEXT"}
+    )
+    # @사용자명 조회는 대소문자 구분 없이 인덱스로 처리
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_username_cache_username "
+        "ON username_cache (username COLLATE NOCASE)"
+    )
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT NOT NULL,
+            group_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            username TEXT,
+            action TEXT NOT NULL,
+            reason TEXT,
+            origin_title TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    """
+    )
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sync_outbox_status ON sync_outbox (status, id)"
+    )
+
+
+async def integer_keys(conn: aiosqlite.Connection) -> None:
+    """TEXT 기본 키(chat_id, user_id, admin_id)를 INTEGER로 변환."""
+    await _rebuild_table(
+        conn,
+        "groups",
+        """
+        chat_id INTEGER PRIMARY KEY,
+        title TEXT,
+        added_by INTEGER,
+        added_at TEXT,
+        notification BOOLEAN NOT NULL DEFAULT 1
+        """,
+        "chat_id",
+        ["chat_id", "title", "added_by", "added_at", "notification"],
+    )
+    for table in ("banned_users", "kicked_users"):
+        await _rebuild_table(
+            conn,
+            table,
+            """
+            user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            admin_id INTEGER,
+            admin_username TEXT,
+            reason TEXT,
+            chat_id INTEGER,
+            timestamp TEXT
+            """,
+            "user_id",
+            [
+                "user_id",
+                "username",
+                "admin_id",
+                "admin_username",
+                "reason",
+                "chat_id",
+                "timestamp",
+            ],
+        )
+    await _rebuild_table(
+        conn,
+        "admins",
+        """
+        admin_id INTEGER PRIMARY KEY,
+        username TEXT,
+        added_by_id INTEGER,
+        added_by_username TEXT,
+        timestamp TEXT
+        """,
+        "admin_id",
+        ["admin_id", "username", "added_by_id", "added_by_username", "timestamp"],
+    )
+
+
+async def secondary_indexes(conn: aiosqlite.Connection) -> None:
+    """차단/강퇴 기록과 outbox 정리 쿼리용 인덱스."""
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS idx_banned_users_chat_id ON banned_users (chat_id)",
+        "CREATE INDEX IF NOT EXISTS idx_banned_users_admin_id ON banned_users (admin_id)",
+        "CREATE INDEX IF NOT EXISTS idx_banned_users_timestamp ON banned_users (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_kicked_users_chat_id ON kicked_users (chat_id)",
+        "CREATE INDEX IF NOT EXISTS idx_kicked_users_timestamp ON kicked_users (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_sync_outbox_updated "
+        "ON sync_outbox (status, updated_at)",
+    ):
+        await conn.execute(statement)
+
+
+async def ban_expiry(conn: aiosqlite.Connection) -> None:
+    """기간 차단용 만료 시각 컬럼과 만료 예정 조회용 부분 인덱스."""
+    await _add_missing_columns(conn, "banned_users", {"expires_at": "TEXT"})
+    await conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_banned_users_expires_at "
+        "ON banned_users (expires_at) WHERE expires_at IS NOT NULL"
+    )
+
+
+async def outbox_backoff(conn: aiosqlite.Connection) -> None:
+    """일시적 실패 후 재시도까지 기다리도록 outbox 작업에 다음 시도 시각 추가."""
+    await _add_missing_columns(conn, "sync_outbox", {"next_attempt_at": "TEXT"})
+
+
+# (버전, 이름, 함수) — 순서대로 적용, 추가만 하고 수정하지 않는다
+MIGRATIONS: List[Tuple[int, str, Migration]] = [
+    (1, "initial_schema", initial_schema),
+    (2, "integer_keys", integer_keys),
+    (3, "secondary_indexes", secondary_indexes),
+    (4, "ban_expiry", ban_expiry),
+    (5, "outbox_backoff", outbox_backoff),
+]
+
+
+async def get_schema_version() -> int:
+    rows = await db.fetchall("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return int(rows[0][0]) if rows else 0
+
+
+async def run_migrations() -> int:
+    """대기 중인 마이그레이션을 버전 순서대로 단계별 트랜잭션으로 적용. 현재 버전 반환."""
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """
+    )
+    current = await get_schema_version()
+    for version, name, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        async with db.transaction() as conn:
+            await migrate(conn)
+            await conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (version, name, datetime.now().isoformat()),
+            )
+        current = version
+        logger.info("db_migration_applied", version=version, name=name)
+    logger.info("db_schema_version", version=current)
+    return current
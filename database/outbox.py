@@ -0,0 +1,63 @@
+import asyncio
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import logger
+from utils.storage import insert_outbox_jobs
+from utils.tracing import tracer
+
+ACTION_BAN = "ban"
+ACTION_UNBAN = "unban"
+ACTION_KICK = "kick"
+
+# enqueue 시 워커를 깨우는 이벤트
+outbox_event = asyncio.Event()
+
+
+def build_sync_jobs(
+    action: str,
+    group_ids: Iterable[int],
+    users: List[Tuple[Optional[str], int]],
+    reason: str,
+    origin_title: str,
+) -> List[Dict[str, Any]]:
+    """(그룹 × 사용자) 연동 작업 행 생성. 모두 같은 배치 ID를 갖는다."""
+    batch_id = uuid.uuid4().hex
+    return [
+        {
+            "batch_id": batch_id,
+            "group_id": group_id,
+            "user_id": user_id,
+            "username": username or "",
+            "action": action,
+            "reason": reason,
+            "origin_title": origin_title,
+        }
+        for group_id in group_ids
+        for username, user_id in users
+    ]
+
+
+async def enqueue_sync(
+    action: str,
+    group_ids: Iterable[int],
+    users: List[Tuple[Optional[str], int]],
+    reason: str,
+    origin_title: str,
+) -> Optional[str]:
+    """(그룹, 사용자, 동작) 연동 작업을 실행 전에 기록. 배치 ID 반환."""
+    jobs = build_sync_jobs(action, group_ids, users, reason, origin_title)
+    if not jobs:
+        return None
+    batch_id = jobs[0]["batch_id"]
+    with tracer.span("outbox.enqueue", batch_id=batch_id, job_count=len(jobs)):
+        await insert_outbox_jobs(jobs)
+    outbox_event.set()
+    logger.info(
+        "sync_enqueued",
+        batch_id=batch_id,
+        action=action,
+        job_count=len(jobs),
+        user_ids=[user_id for _, user_id in users],
+    )
+    return batch_id
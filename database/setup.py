@@ -1,60 +1,31 @@
-from datetime import datetime
+from config import DB_INTEGRITY_CHECK, logger
+from database.connection import db
+from database.migrations import run_migrations
 
-import aiosqlite
 
-from config import logger
+async def check_integrity() -> None:
+    """시작 시 무결성 검사 (DB_INTEGRITY_CHECK: quick, full, off)."""
+    if DB_INTEGRITY_CHECK == "off":
+        return
+    try:
+        result = await db.integrity_check(full=DB_INTEGRITY_CHECK == "full")
+    except Exception as e:
+        logger.error("db_integrity_check_error", error=str(e))
+        return
+    if result == ["ok"]:
+        logger.info("db_integrity_check_ok", mode=DB_INTEGRITY_CHECK)
+    else:
+        logger.error(
+            "db_integrity_check_failed", mode=DB_INTEGRITY_CHECK, problems=result[:20]
+        )
 
 
 async def init_db():
-    """SQLite 데이터베이스 초기화."""
+    """SQLite 데이터베이스 초기화 (무결성 검사 후 마이그레이션 적용)."""
+    await check_integrity()
     try:
-        async with aiosqlite.connect("data/bot.db") as conn:
-            # 테이블 생성
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS groups (
-                    chat_id TEXT PRIMARY KEY,
-                    title TEXT,
-                    added_by INTEGER,
-                    added_at TEXT,
-                    notification BOOLEAN
-                )
-            """
-            )
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS banned_users (
-                    user_id TEXT PRIMARY KEY,
-                    username TEXT,
-                    admin_id INTEGER,
-                    admin_username TEXT,
-                    reason TEXT,
-                    chat_id INTEGER,
-                    timestamp TEXT
-                )
-            """
-            )
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS admins (
-                    admin_id TEXT PRIMARY KEY,
-                    username TEXT,
-                    added_by_id INTEGER,
-                    added_by_username TEXT,
-                    timestamp TEXT
-                )
-            """
-            )
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS username_cache (
-                    user_id INTEGER PRIMARY KEY,
-                    username TEXT
-                )
-            """
-            )
-            await conn.commit()
-        logger.info("database_initialized", db_path="data/bot.db")
+        await run_migrations()
+        logger.info("database_initialized", db_path=db.path)
     except Exception as e:
         logger.error("database_init_error", error=str(e))
         raise
@@ -1,14 +1,211 @@
-from typing import Optional
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
 
-from config import logger
-from utils.storage import cache_username, get_user_id_from_cache
+from config import (
+    USERNAME_CACHE_SIZE,
+    USERNAME_FLUSH_INTERVAL,
+    USERNAME_FLUSH_SIZE,
+    logger,
+)
+from utils import storage
+from utils.tracing import detached_task
 
+# (username, first_name, last_name)
+Profile = Tuple[Optional[str], Optional[str], Optional[str]]
 
-async def cache_username(user_id: int, username: str) -> None:
-    """사용자명 캐싱."""
-    await cache_username(user_id, username)
+
+class UsernameLRU:
+    """소문자 사용자명 → user_id 메모리 LRU. DB 조회 앞단에서 사용."""
+
+    def __init__(self, maxsize: int = USERNAME_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._ids: "OrderedDict[str, int]" = OrderedDict()
+        self._names: Dict[int, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get(self, username: str) -> Optional[int]:
+        key = username.lstrip("@").lower()
+        user_id = self._ids.get(key)
+        if user_id is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._ids.move_to_end(key)
+        return user_id
+
+    def set(self, username: str, user_id: int) -> None:
+        key = username.lstrip("@").lower()
+        # 사용자명 변경 시 이전 이름 제거
+        previous = self._names.get(user_id)
+        if previous is not None and previous != key:
+            self._ids.pop(previous, None)
+        owner = self._ids.get(key)
+        if owner is not None and owner != user_id:
+            self._names.pop(owner, None)
+        self._ids[key] = user_id
+        self._ids.move_to_end(key)
+        self._names[user_id] = key
+        while len(self._ids) > self.maxsize:
+            evicted, evicted_id = self._ids.popitem(last=False)
+            if self._names.get(evicted_id) == evicted:
+                del self._names[evicted_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._ids), "hits": self.hits, "misses": self.misses}
+
+
+class ProfileLRU:
+    """user_id → 마지막으로 기록한 프로필. 변경된 행만 저장하도록 중복 제거."""
+
+    def __init__(self, maxsize: int = USERNAME_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._profiles: "OrderedDict[int, Profile]" = OrderedDict()
+
+    def changed(self, user_id: int, profile: Profile) -> bool:
+        known = self._profiles.get(user_id)
+        if known is not None:
+            self._profiles.move_to_end(user_id)
+        return known != profile
+
+    def set(self, user_id: int, profile: Profile) -> None:
+        self._profiles[user_id] = profile
+        self._profiles.move_to_end(user_id)
+        if len(self._profiles) > self.maxsize:
+            self._profiles.popitem(last=False)
+
+
+class UsernameWriteBuffer:
+    """사용자명 캐시 쓰기 지연 버퍼.
+
+    user_id별 마지막 값만 남기고 interval초마다 또는 size건이 쌓이면 한 트랜잭션으로 저장.
+    """
+
+    def __init__(
+        self, interval: float = USERNAME_FLUSH_INTERVAL, size: int = USERNAME_FLUSH_SIZE
+    ):
+        self.interval = interval
+        self.size = size
+        self._pending: Dict[int, Profile] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, user_id: int, profile: Profile) -> None:
+        self._pending[user_id] = profile
+        if len(self._pending) >= self.size:
+            self._spawn_flush()
+        elif self._timer is None:
+            self._timer = detached_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        await self.flush()
+
+    def _spawn_flush(self) -> None:
+        task = detached_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self) -> None:
+        """대기 중인 사용자명을 모두 저장."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            try:
+                await storage.upsert_usernames(batch)
+                logger.info("username_cache_flushed", count=len(batch))
+            except Exception as e:
+                # 실패한 항목은 그 사이 들어온 새 값을 덮어쓰지 않고 다시 대기
+                for user_id, profile in batch.items():
+                    self._pending.setdefault(user_id, profile)
+                logger.error(
+                    "username_cache_flush_failed", count=len(batch), error=str(e)
+                )
+                # 새 항목이 들어오지 않아도 다음 주기에 다시 시도
+                if self._timer is None:
+                    self._timer = detached_task(self._flush_later())
+
+    async def close(self) -> None:
+        if self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+        await self.flush()
+
+
+username_lru = UsernameLRU()
+profile_lru = ProfileLRU()
+username_writer = UsernameWriteBuffer()
+
+
+def profile_changed(
+    user_id: int,
+    username: Optional[str],
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+) -> bool:
+    """마지막 기록 이후 프로필이 바뀌었는지 확인."""
+    return profile_lru.changed(user_id, (username, first_name, last_name))
+
+
+async def cache_username(
+    user_id: int,
+    username: Optional[str],
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+) -> None:
+    """사용자명 캐싱. DB 저장은 username_writer가 모아서 처리."""
+    profile = (username, first_name, last_name)
+    if not profile_lru.changed(user_id, profile):
+        return
+    profile_lru.set(user_id, profile)
+    if username:
+        username_lru.set(username, user_id)
+    username_writer.add(user_id, profile)
 
 
 async def get_user_id_from_cache(username: str) -> Optional[int]:
     """캐시에서 사용자 ID 조회."""
-    return await get_user_id_from_cache(username)
+    user_id = username_lru.get(username)
+    if user_id is not None:
+        return user_id
+    user_id = await storage.get_user_id_from_cache(username)
+    if user_id is not None:
+        username_lru.set(username, user_id)
+    return user_id
+
+
+async def get_user_ids_from_cache(usernames: Iterable[str]) -> Dict[str, int]:
+    """여러 사용자명을 조회. 메모리에 없는 이름만 DB 1회 조회. 소문자 사용자명 → user_id."""
+    result: Dict[str, int] = {}
+    missing = []
+    for username in usernames:
+        key = username.lstrip("@").lower()
+        user_id = username_lru.get(key)
+        if user_id is None:
+            missing.append(key)
+        else:
+            result[key] = user_id
+    if missing:
+        found = await storage.get_user_ids_from_cache(missing)
+        for key, user_id in found.items():
+            username_lru.set(key, user_id)
+        result.update(found)
+        logger.info(
+            "username_bulk_lookup",
+            requested=len(missing),
+            found=len(found),
+        )
+    return result
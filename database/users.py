@@ -1,20 +1,22 @@
-import json
-import os
 from datetime import datetime
 from typing import Optional
 
-import aiofiles
-
-from config import ADMINS_FILE, BANNED_USERS_FILE, logger
+from config import logger
+from utils.storage import (
+    admin_exists,
+    banned_user_exists,
+    delete_admin,
+    delete_banned_user,
+    load_admins,
+    upsert_admins,
+    upsert_banned_users,
+    upsert_kicked_users,
+)
 
 
 async def is_banned(user_id: int) -> bool:
     try:
-        if os.path.exists(BANNED_USERS_FILE):
-            async with aiofiles.open(BANNED_USERS_FILE, "r") as f:
-                banned_users = json.loads(await f.read())
-            return str(user_id) in banned_users
-        return False
+        return await banned_user_exists(user_id)
     except Exception as e:
         logger.error(f"Error checking banned user: {e}")
         return False
@@ -22,13 +24,7 @@ async def is_banned(user_id: int) -> bool:
 
 async def unban_user(user_id: int) -> None:
     try:
-        if os.path.exists(BANNED_USERS_FILE):
-            async with aiofiles.open(BANNED_USERS_FILE, "r") as f:
-                banned_users = json.loads(await f.read())
-            if str(user_id) in banned_users:
-                del banned_users[str(user_id)]
-                async with aiofiles.open(BANNED_USERS_FILE, "w") as f:
-                    await f.write(json.dumps(banned_users, indent=2))
+        await delete_banned_user(user_id)
     except Exception as e:
         logger.error(f"Error unbanning user: {e}")
 
@@ -40,22 +36,22 @@ async def ban_user(
     admin_username: Optional[str],
     reason: str,
     chat_id: int,
+    expires_at: Optional[str] = None,
 ) -> None:
     try:
-        banned_users = {}
-        if os.path.exists(BANNED_USERS_FILE):
-            async with aiofiles.open(BANNED_USERS_FILE, "r") as f:
-                banned_users = json.loads(await f.read())
-        banned_users[str(user_id)] = {
-            "username": username or "",
-            "admin_id": admin_id,
-            "admin_username": admin_username or "",
-            "reason": reason,
-            "chat_id": chat_id,
-            "timestamp": datetime.now().isoformat(),
-        }
-        async with aiofiles.open(BANNED_USERS_FILE, "w") as f:
-            await f.write(json.dumps(banned_users, indent=2))
+        await upsert_banned_users(
+            {
+                user_id: {
+                    "username": username or "",
+                    "admin_id": admin_id,
+                    "admin_username": admin_username or "",
+                    "reason": reason,
+                    "chat_id": chat_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "expires_at": expires_at,
+                }
+            }
+        )
     except Exception as e:
         logger.error(f"Error banning user: {e}")
 
@@ -69,34 +65,25 @@ async def kick_user(
     chat_id: int,
 ) -> None:
     try:
-        kicked_users = {}
-        kicked_file = os.path.join(
-            os.path.dirname(BANNED_USERS_FILE), "kicked_users.json"
+        await upsert_kicked_users(
+            {
+                user_id: {
+                    "username": username or "",
+                    "admin_id": admin_id,
+                    "admin_username": admin_username or "",
+                    "reason": reason,
+                    "chat_id": chat_id,
+                    "timestamp": datetime.now().isoformat(),
+                }
+            }
         )
-        if os.path.exists(kicked_file):
-            async with aiofiles.open(kicked_file, "r") as f:
-                kicked_users = json.loads(await f.read())
-        kicked_users[str(user_id)] = {
-            "username": username or "",
-            "admin_id": admin_id,
-            "admin_username": admin_username or "",
-            "reason": reason,
-            "chat_id": chat_id,
-            "timestamp": datetime.now().isoformat(),
-        }
-        async with aiofiles.open(kicked_file, "w") as f:
-            await f.write(json.dumps(kicked_users, indent=2))
     except Exception as e:
         logger.error(f"Error kicking user: {e}")
 
 
 async def is_admin(user_id: int) -> bool:
     try:
-        if os.path.exists(ADMINS_FILE):
-            async with aiofiles.open(ADMINS_FILE, "r") as f:
-                admins = json.loads(await f.read())
-            return str(user_id) in admins
-        return False
+        return await admin_exists(user_id)
     except Exception as e:
         logger.error(f"Error checking admin: {e}")
         return False
@@ -109,18 +96,16 @@ async def add_admin(
     added_by_username: Optional[str],
 ) -> bool:
     try:
-        admins = {}
-        if os.path.exists(ADMINS_FILE):
-            async with aiofiles.open(ADMINS_FILE, "r") as f:
-                admins = json.loads(await f.read())
-        admins[str(admin_id)] = {
-            "username": username or "",
-            "added_by_id": added_by_id,
-            "added_by_username": added_by_username or "",
-            "timestamp": datetime.now().isoformat(),
-        }
-        async with aiofiles.open(ADMINS_FILE, "w") as f:
-            await f.write(json.dumps(admins, indent=2))
+        await upsert_admins(
+            {
+                admin_id: {
+                    "username": username or "",
+                    "added_by": added_by_id,
+                    "added_by_username": added_by_username or "",
+                    "timestamp": datetime.now().isoformat(),
+                }
+            }
+        )
         return True
     except Exception as e:
         logger.error(f"Error adding admin: {e}")
@@ -129,15 +114,7 @@ async def add_admin(
 
 async def remove_admin(admin_id: int) -> bool:
     try:
-        if os.path.exists(ADMINS_FILE):
-            async with aiofiles.open(ADMINS_FILE, "r") as f:
-                admins = json.loads(await f.read())
-            if str(admin_id) in admins:
-                del admins[str(admin_id)]
-                async with aiofiles.open(ADMINS_FILE, "w") as f:
-                    await f.write(json.dumps(admins, indent=2))
-                return True
-        return False
+        return await delete_admin(admin_id)
     except Exception as e:
         logger.error(f"Error removing admin: {e}")
         return False
@@ -145,10 +122,7 @@ async def remove_admin(admin_id: int) -> bool:
 
 async def get_admins() -> dict:
     try:
-        if os.path.exists(ADMINS_FILE):
-            async with aiofiles.open(ADMINS_FILE, "r") as f:
-                return json.loads(await f.read())
-        return {}
+        return await load_admins()
     except Exception as e:
         logger.error(f"Error getting admins: {e}")
         return {}
@@ -1,26 +1,53 @@
-import asyncio
-import logging
-from typing import List, Optional, Set, Tuple
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
 from aiogram import Bot, Router, types
 from aiogram.filters import Command
 
-from database.groups import get_groups, get_notification_status
+from config import logger
+from database.groups import get_target_group_ids
+from database.outbox import ACTION_BAN, ACTION_UNBAN, enqueue_sync
 from database.users import ban_user, is_banned, unban_user
-from handlers.sync_ban import ban_in_group
+from utils.cache import get_chat_member
 from utils.common import extract_user_info
+from utils.fanout import Cell, FanoutResult, build_matrix, run_fanout
 from utils.logger import log_ban, log_unban
+from utils.metrics import timed
 from utils.permissions import is_admin, is_group_admin
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
+from utils.retry import classify_error, is_chat_level_error
+from utils.tracing import traced
+from handlers.ban_expiry import ban_expiry, expiry_timestamp, format_expiry
 
 router = Router()
 
 
+def summarize_result(
+    cells: List[Cell], result: FanoutResult, error_event: str
+) -> Tuple[List[Tuple[Optional[str], int]], List[str], List[str]]:
+    """셀 결과를 (성공, 건너뜀, 실패) 목록으로 나눈다. 실패는 오류 종류와 함께 기록."""
+    success: List[Tuple[Optional[str], int]] = []
+    skipped: List[str] = []
+    failed: List[str] = []
+    for cell in cells:
+        chat_id, target_id = cell
+        error = result.errors.get(cell)
+        if error is not None:
+            kind = "chat" if is_chat_level_error(error) else classify_error(error)
+            logger.error(
+                error_event,
+                chat_id=chat_id,
+                target_id=target_id,
+                error_kind=kind,
+                error=str(error),
+            )
+            failed.append(f"{target_id} ({kind})")
+        elif result.values.get(cell):
+            success.append(result.values[cell])
+        else:
+            skipped.append(str(target_id))
+    return success, skipped, failed
+
+
 @router.message(Command(commands=["ban", "벤"], prefix="."))
 async def ban_user_cmd(message: types.Message, bot: Bot):
     if not message.from_user:
@@ -39,43 +66,57 @@ async def ban_user_cmd(message: types.Message, bot: Bot):
             await message.reply("Groups only")
             return
 
-        user_info = await extract_user_info(message, bot)
+        user_info = await extract_user_info(message, bot, with_duration=True)
         chat_id = message.chat.id
         chat_title = message.chat.title or "Unknown"
         reason = user_info["reason"] or ""
-        target_ids = (
-            user_info.get("user_ids", [user_info["user_id"]])
-            if user_info.get("user_id")
-            else []
+        target_ids = user_info["user_ids"] or (
+            [user_info["user_id"]] if user_info["user_id"] else []
         )
 
         if not target_ids:
             await message.reply("Specify user ID(s)")
             return
 
-        results = await asyncio.gather(
-            *[
-                process_ban(message, bot, target_id, reason, set())
-                for target_id in target_ids
-            ],
-            return_exceptions=True,
+        # 기간 차단 (.ban 123 7d 사유, 답장이면 .ban 7d 사유)
+        expires_at = (
+            expiry_timestamp(datetime.now(timezone.utc) + user_info["duration"])
+            if user_info["duration"]
+            else None
         )
 
-        success = []
-        failed = []
-        for target_id, result in zip(target_ids, results):
-            if isinstance(result, Exception) or not result:
-                failed.append(f"{target_id}")
-            else:
-                success.append(result)
+        cells = build_matrix([chat_id], target_ids)
+        result = await run_fanout(
+            cells,
+            lambda _, target_id: process_ban(message, bot, target_id, reason, expires_at),
+        )
+        success, skipped, failed = summarize_result(cells, result, "process_ban_error")
+
+        if expires_at:
+            for _, target_id in success:
+                ban_expiry.schedule(target_id, expires_at)
+
+        # 다른 그룹 연동은 outbox에 기록 후 워커가 처리
+        if success:
+            await enqueue_sync(
+                ACTION_BAN,
+                await get_target_group_ids(exclude=chat_id),
+                success,
+                reason,
+                chat_title,
+            )
 
         message_text = ["🚷 Ban"]
         if success:
             message_text.append(
                 "\n".join(f"{u or 'Unknown'} ({i})" for u, i in success)
             )
+        if skipped:
+            message_text.append(f"Skipped: {', '.join(skipped)}")
         if failed:
             message_text.append(f"Failed: {', '.join(failed)}")
+        if success and expires_at:
+            message_text.append(f"⏳ Until {format_expiry(expires_at)}")
 
         await message.reply(
             "\n".join(message_text) + f"\n[{reason}][{chat_title}]", parse_mode="HTML"
@@ -92,68 +133,45 @@ async def ban_user_cmd(message: types.Message, bot: Bot):
                 reason,
             )
 
-            # FIX: Added await since get_groups() appears to be async
-            groups = await get_groups()  # 비동기 호출로 변경 (줄 95)
-            await asyncio.gather(
-                *[
-                    ban_in_group(
-                        bot, int(g), success, reason, chat_title, {str(chat_id)}
-                    )
-                    for g in groups.keys()
-                    if g != str(chat_id)
-                ],
-                return_exceptions=True,
-            )
-
     except Exception as e:
-        logger.error(f"ban_error: chat_id={message.chat.id}, error={e}")
+        logger.error("ban_error", chat_id=message.chat.id, error=str(e))
         await message.reply("Error occurred")
 
 
+@timed("process_ban")
+@traced("process_ban")
 async def process_ban(
     message: types.Message,
     bot: Bot,
     target_id: int,
     reason: str,
-    processed_groups: Set[str],
+    expires_at: Optional[str] = None,
 ) -> Optional[Tuple[Optional[str], int]]:
+    """현재 그룹에서 차단. 본인/봇/관리자는 None(건너뜀), 실패는 예외로 전달."""
     chat_id = message.chat.id
-    if (
-        str(chat_id) in processed_groups
-        or not message.from_user
-        or target_id in (message.from_user.id, bot.id)
-    ):
+    if not message.from_user or target_id in (message.from_user.id, bot.id):
         return None
 
-    processed_groups.add(str(chat_id))
+    chat_member = await get_chat_member(bot, chat_id, target_id)
+    if isinstance(chat_member, (types.ChatMemberOwner, types.ChatMemberAdministrator)):
+        return None
 
-    try:
-        chat_member = await bot.get_chat_member(chat_id, target_id)
-        if isinstance(
-            chat_member, (types.ChatMemberOwner, types.ChatMemberAdministrator)
-        ):
-            return None
+    user = chat_member.user
+    username = (
+        user.username or f"{user.first_name} {user.last_name}".strip() or "Nickname"
+    )
+    await bot.ban_chat_member(chat_id, target_id)
 
-        user = chat_member.user
-        username = (
-            user.username or f"{user.first_name} {user.last_name}".strip() or "Nickname"
-        )
-        await bot.ban_chat_member(chat_id, target_id)
-
-        await ban_user(
-            target_id,
-            username,
-            message.from_user.id,
-            message.from_user.username or "Unknown",
-            reason,
-            chat_id,
-        )
-        return (username, target_id)
-    except Exception as e:
-        logger.error(
-            f"process_ban_error: chat_id={chat_id}, target_id={target_id}, error={e}"
-        )
-        return None
+    await ban_user(
+        target_id,
+        username,
+        message.from_user.id,
+        message.from_user.username or "Unknown",
+        reason,
+        chat_id,
+        expires_at,
+    )
+    return (username, target_id)
 
 
 @router.message(Command(commands=["unban", "언벤"], prefix="."))
@@ -178,37 +196,36 @@ async def unban_user_cmd(message: types.Message, bot: Bot):
         chat_id = message.chat.id
         chat_title = message.chat.title or "Unknown"
         reason = user_info["reason"] or ""
-        target_ids = (
-            user_info.get("user_ids", [user_info["user_id"]])
-            if user_info.get("user_id")
-            else []
+        target_ids = user_info["user_ids"] or (
+            [user_info["user_id"]] if user_info["user_id"] else []
         )
 
         if not target_ids:
             await message.reply("Specify user ID(s)")
             return
 
-        results = await asyncio.gather(
-            *[
-                process_unban(message, bot, target_id, reason)
-                for target_id in target_ids
-            ],
-            return_exceptions=True,
+        cells = build_matrix([chat_id], target_ids)
+        result = await run_fanout(
+            cells, lambda _, target_id: process_unban(message, bot, target_id, reason)
         )
+        success, skipped, failed = summarize_result(cells, result, "process_unban_error")
 
-        success = []
-        failed = []
-        for target_id, result in zip(target_ids, results):
-            if isinstance(result, Exception) or not result:
-                failed.append(f"{target_id}")
-            else:
-                success.append(result)
+        if success:
+            await enqueue_sync(
+                ACTION_UNBAN,
+                await get_target_group_ids(exclude=chat_id),
+                success,
+                reason,
+                chat_title,
+            )
 
         message_text = ["✅ Unban"]
         if success:
             message_text.append(
                 "\n".join(f"{u or 'Unknown'} ({i})" for u, i in success)
             )
+        if skipped:
+            message_text.append(f"Skipped: {', '.join(skipped)}")
         if failed:
             message_text.append(f"Failed: {', '.join(failed)}")
 
@@ -228,52 +245,29 @@ async def unban_user_cmd(message: types.Message, bot: Bot):
                     chat_id,
                 )
 
-            # FIX: Added await since get_groups() appears to be async
-            groups = await get_groups()  # 비동기 호출로 변경 (줄 225)
-            for group_id in groups.keys():
-                if group_id != str(chat_id) and get_notification_status(int(group_id)):
-                    try:
-                        for _, target_id in success:
-                            await bot.unban_chat_member(int(group_id), target_id)
-                        notification = (
-                            "✅ Unban\n"
-                            + "\n".join(f"{u or 'Unknown'} ({i})" for u, i in success)
-                            + f"\n[{chat_title}][{reason}]"
-                        )
-                        await bot.send_message(
-                            int(group_id), notification, parse_mode="HTML"
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"group_unban_failed: group_id={group_id}, error={e}"
-                        )
-
     except Exception as e:
-        logger.error(f"unban_error: chat_id={message.chat.id}, error={e}")
+        logger.error("unban_error", chat_id=message.chat.id, error=str(e))
         await message.reply("Error occurred")
 
 
+@timed("process_unban")
+@traced("process_unban")
 async def process_unban(
     message: types.Message, bot: Bot, target_id: int, reason: str
 ) -> Optional[Tuple[Optional[str], int]]:
+    """현재 그룹에서 차단 해제. 차단 기록이 없으면 None(건너뜀), 실패는 예외로 전달."""
     chat_id = message.chat.id
     if not message.from_user:
         return None
 
-    try:
-        chat_member = await bot.get_chat_member(chat_id, target_id)
-        user = chat_member.user
-        username = (
-            user.username or f"{user.first_name} {user.last_name}".strip() or "Nickname"
-        )
-        if not await is_banned(target_id):
-            return None
-
-        await bot.unban_chat_member(chat_id, target_id)
-        await unban_user(target_id)
-        return (username, target_id)
-    except Exception as e:
-        logger.error(
-            f"process_unban_error: chat_id={chat_id}, target_id={target_id}, error={e}"
-        )
+    chat_member = await get_chat_member(bot, chat_id, target_id)
+    user = chat_member.user
+    username = (
+        user.username or f"{user.first_name} {user.last_name}".strip() or "Nickname"
+    )
+    if not await is_banned(target_id):
         return None
+
+    await bot.unban_chat_member(chat_id, target_id)
+    await unban_user(target_id)
+    return (username, target_id)
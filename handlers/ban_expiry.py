@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+
+from config import BAN_EXPIRY_BATCH_SIZE, BAN_EXPIRY_RETRY_DELAY, logger
+from database.groups import get_group, get_target_group_ids
+from database.outbox import ACTION_UNBAN, build_sync_jobs, outbox_event
+from utils.logger import log_unban
+from utils.storage import expire_bans, load_expired_bans, load_upcoming_ban_expiries
+
+EXPIRY_REASON = "기간 만료"
+# 만료 예정이 없을 때도 주기적으로 깨어나는 최대 대기 시간 (초)
+MAX_SLEEP = 3600
+
+
+def expiry_timestamp(at: datetime) -> str:
+    """expires_at 컬럼 형식 (UTC 초 단위 ISO, 문자열 비교로 정렬 가능)."""
+    return at.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def parse_expiry(value: str) -> datetime:
+    # 시간대 없는 값은 UTC로 간주
+    at = datetime.fromisoformat(value)
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+def format_expiry(value: str) -> str:
+    """사용자에게 보여 줄 만료 시각 (2026-01-02 03:04:05 UTC)."""
+    return parse_expiry(value).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+class BanExpiryScheduler:
+    """기간 차단 만료를 처리하는 단일 작업.
+
+    DB에서 만료가 가장 이른 batch_size건만 min-heap으로 읽어 두고, 맨 앞 만료 시각까지 잠든다.
+    만료되면 DB의 만료 기록을 다시 조회해 모든 그룹에 대한 unban 작업을 outbox에 넣는다.
+    해제 대상은 만료 시점에 등록된 그룹이므로, 차단 후 등록 해제된 그룹에는 차단이 남는다.
+    중지 중에 지난 만료는 시작 시 바로 처리된다. 시각은 모두 UTC.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = BAN_EXPIRY_BATCH_SIZE,
+        retry_delay: float = BAN_EXPIRY_RETRY_DELAY,
+    ):
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self._heap: List[Tuple[str, int]] = []
+        # 마지막 로드가 가득 찼으면 그 마지막 만료 시각 (이후 항목은 DB에만 있음)
+        self._horizon: Optional[str] = None
+        self._loaded = False
+        self._wakeup = asyncio.Event()
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def start(self, bot: Bot) -> None:
+        self._bot = bot
+        self._loaded = False
+        self._task = asyncio.create_task(self._run())
+        logger.info("ban_expiry_started", batch_size=self.batch_size)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("ban_expiry_stopped")
+
+    def schedule(self, user_id: int, expires_at: str) -> None:
+        """새 기간 차단 등록. 로드 범위 밖이면 나중에 DB에서 읽는다."""
+        if self._horizon is not None and expires_at > self._horizon:
+            return
+        heapq.heappush(self._heap, (expires_at, user_id))
+        if self._heap[0] == (expires_at, user_id):
+            self._wakeup.set()
+
+    async def _load(self) -> None:
+        upcoming = await load_upcoming_ban_expiries(self.batch_size)
+        self._horizon = upcoming[-1][0] if len(upcoming) >= self.batch_size else None
+        # 로드 중에 schedule()로 들어온 항목 유지 (중복은 만료 시 DB 조회로 무해)
+        entries = set(upcoming)
+        entries.update(self._heap)
+        if self._horizon is not None:
+            entries = {entry for entry in entries if entry[0] <= self._horizon}
+        self._heap = list(entries)
+        heapq.heapify(self._heap)
+        self._loaded = True
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                if not self._loaded or (not self._heap and self._horizon is not None):
+                    await self._load()
+                timeout: float = MAX_SLEEP
+                if self._heap:
+                    due = parse_expiry(self._heap[0][0])
+                    timeout = min(
+                        (due - datetime.now(timezone.utc)).total_seconds(), MAX_SLEEP
+                    )
+                    if timeout <= 0:
+                        await self._expire_due()
+                        continue
+            except Exception as e:
+                logger.error("ban_expiry_failed", error=str(e))
+                self._loaded = False
+                timeout = self.retry_delay
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _expire_due(self) -> None:
+        now = expiry_timestamp(datetime.now(timezone.utc))
+        while self._heap and self._heap[0][0] <= now:
+            heapq.heappop(self._heap)
+        # heap은 시각만 알려주고, 대상은 DB 기준 (해제/재차단된 항목은 자연히 빠짐)
+        expired = await load_expired_bans(now, self.batch_size)
+        if len(expired) >= self.batch_size:
+            # 같은 시각에 더 남아 있을 수 있으므로 다음 회차에 다시 로드
+            self._loaded = False
+        if not expired:
+            return
+
+        by_chat: Dict[int, List[Dict]] = {}
+        for ban in expired:
+            by_chat.setdefault(ban["chat_id"], []).append(ban)
+        group_ids = await get_target_group_ids()
+        jobs = []
+        for chat_id, bans in by_chat.items():
+            group = await get_group(chat_id)
+            jobs.extend(
+                build_sync_jobs(
+                    ACTION_UNBAN,
+                    group_ids,
+                    [(ban["username"], ban["user_id"]) for ban in bans],
+                    EXPIRY_REASON,
+                    group["title"] if group else "",
+                )
+            )
+        # 해제 작업 기록과 차단 삭제를 한 트랜잭션으로 (중간 종료 시 재기록 방지)
+        await expire_bans([(ban["user_id"], ban["expires_at"]) for ban in expired], jobs)
+        if jobs:
+            outbox_event.set()
+        logger.info("bans_expired", count=len(expired), job_count=len(jobs))
+
+        if self._bot is None:
+            return
+        for ban in expired:
+            group = await get_group(ban["chat_id"])
+            await log_unban(
+                self._bot,
+                ban["user_id"],
+                ban["username"] or "Unknown",
+                self._bot.id,
+                "auto",
+                group["title"] if group else "Unknown",
+                ban["chat_id"],
+            )
+
+
+ban_expiry = BanExpiryScheduler()
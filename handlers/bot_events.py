@@ -3,6 +3,7 @@ from aiogram.filters import JOIN_TRANSITION, ChatMemberUpdatedFilter
 from aiogram.types import ChatMemberUpdated
 
 from config import LOG_CHANNEL_ID, MASTER_ADMIN_IDS, logger
+from utils.cache import get_chat_member
 from utils.logger import log_bot_added
 
 router = Router()
@@ -20,7 +21,7 @@ async def on_bot_added(event: ChatMemberUpdated, bot: Bot):
 
     # 봇의 관리자 권한 확인
     try:
-        bot_member = await bot.get_chat_member(chat_id, bot.id)
+        bot_member = await get_chat_member(bot, chat_id, bot.id)
         is_admin = isinstance(
             bot_member, (types.ChatMemberAdministrator, types.ChatMemberOwner)
         )
@@ -2,7 +2,7 @@ from aiogram import Bot, Router, types
 from aiogram.filters import Command
 
 from config import logger
-from database.groups import add_group, get_groups, remove_group
+from database.groups import add_group, get_group, get_groups, remove_group
 from utils.logger import log_group_add, log_group_remove
 from utils.permissions import is_admin, is_group_admin
 
@@ -165,12 +165,12 @@ async def delete_group(message: types.Message, bot: Bot) -> None:
 
     chat_id = int(text[1])
     try:
-        groups = await get_groups()
-        if str(chat_id) not in groups:
+        group = await get_group(chat_id)
+        if group is None:
             await message.reply(f"그룹 ID {chat_id}가 등록되어 있지 않습니다.")
             return
 
-        title = groups[str(chat_id)]["title"]
+        title = group["title"]
         if await remove_group(chat_id):
             await log_group_remove(
                 bot,
@@ -0,0 +1,175 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+
+from config import (
+    FANOUT_CONCURRENCY,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_RETENTION_DAYS,
+    OUTBOX_RETRY_BASE_DELAY,
+    OUTBOX_RETRY_MAX_DELAY,
+    logger,
+)
+from database.outbox import ACTION_BAN, ACTION_KICK, ACTION_UNBAN, outbox_event
+from handlers.sync_ban import ban_in_groups
+from handlers.sync_kick import kick_in_groups
+from handlers.sync_unban import unban_in_groups
+from utils.fanout import FanoutResult
+from utils.retry import ERROR_PERMANENT, backoff_delay, classify_error
+from utils.storage import (
+    claim_outbox_jobs,
+    outbox_timestamp,
+    purge_outbox_jobs,
+    reset_running_outbox_jobs,
+    update_outbox_jobs,
+)
+from utils.tracing import tracer
+
+SYNC_ACTIONS = {
+    ACTION_BAN: ban_in_groups,
+    ACTION_UNBAN: unban_in_groups,
+    ACTION_KICK: kick_in_groups,
+}
+
+
+def retry_delay(attempts: int, error: BaseException) -> float:
+    """실패한 작업의 다음 시도까지 대기 시간. RetryAfter는 그 값 이상 기다린다."""
+    delay = backoff_delay(attempts, OUTBOX_RETRY_BASE_DELAY, OUTBOX_RETRY_MAX_DELAY)
+    if isinstance(error, TelegramRetryAfter):
+        delay = max(delay, float(error.retry_after))
+    # full jitter가 0에 가까워도 같은 루프에서 바로 다시 가져가지 않도록 하한 적용
+    return max(delay, OUTBOX_RETRY_BASE_DELAY / 2)
+
+
+class OutboxWorker:
+    """sync_outbox 작업을 명령(batch) 단위 매트릭스로 실행하는 워커.
+
+    동시성은 fan-out 실행기(FANOUT_CONCURRENCY)가 제한한다.
+    """
+
+    def __init__(self, bot: Bot, poll_interval: float = OUTBOX_POLL_INTERVAL):
+        self.bot = bot
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """중단된 작업을 재개하고 디스패처 시작."""
+        resumed = await reset_running_outbox_jobs()
+        before = (datetime.now() - timedelta(days=OUTBOX_RETENTION_DAYS)).isoformat()
+        purged = await purge_outbox_jobs(before)
+        self._task = asyncio.create_task(self._run())
+        outbox_event.set()
+        logger.info(
+            "outbox_worker_started",
+            concurrency=FANOUT_CONCURRENCY,
+            resumed_jobs=resumed,
+            purged_jobs=purged,
+        )
+
+    async def stop(self) -> None:
+        """디스패처 중지. 처리 중인 작업은 다음 시작 시 재개된다."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("outbox_worker_stopped")
+
+    async def _run(self) -> None:
+        while True:
+            outbox_event.clear()
+            try:
+                # 대기 작업이 남아 있으면 이벤트를 기다리지 않고 계속 처리
+                if await self._drain_once():
+                    continue
+            except Exception as e:
+                logger.error("outbox_dispatch_failed", error=str(e))
+            try:
+                await asyncio.wait_for(outbox_event.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _drain_once(self) -> bool:
+        jobs = await claim_outbox_jobs(OUTBOX_BATCH_SIZE)
+        if not jobs:
+            return False
+        # 명령 단위(batch)와 동작별로 묶어 id 순서대로 실행
+        batches: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for job in jobs:
+            batches.setdefault((job["batch_id"], job["action"]), []).append(job)
+        for (_, action), batch in batches.items():
+            await self._run_batch(action, batch)
+        return True
+
+    async def _run_batch(self, action: str, jobs: List[Dict[str, Any]]) -> None:
+        sync = SYNC_ACTIONS.get(action)
+        if sync is None:
+            await update_outbox_jobs(
+                [job["id"] for job in jobs], "failed", f"unknown action: {action}"
+            )
+            return
+
+        # 명령 trace와는 batch_id로 연결
+        with tracer.root(
+            f"outbox.{action}", batch_id=jobs[0]["batch_id"], job_count=len(jobs)
+        ):
+            try:
+                result = await sync(
+                    self.bot,
+                    [(job["group_id"], job["user_id"]) for job in jobs],
+                    {job["user_id"]: job["username"] for job in jobs},
+                    jobs[0]["reason"] or "",
+                    jobs[0]["origin_title"] or "",
+                )
+            except Exception as e:
+                logger.error("outbox_batch_failed", action=action, error=str(e))
+                await self._record_errors(
+                    jobs, {(j["group_id"], j["user_id"]): e for j in jobs}
+                )
+                return
+            await self._record_result(jobs, result)
+
+    async def _record_result(
+        self, jobs: List[Dict[str, Any]], result: FanoutResult
+    ) -> None:
+        done = [
+            job["id"]
+            for job in jobs
+            if (job["group_id"], job["user_id"]) not in result.errors
+        ]
+        await update_outbox_jobs(done, "done", increment_attempts=True)
+        await self._record_errors(
+            [j for j in jobs if (j["group_id"], j["user_id"]) in result.errors],
+            result.errors,
+        )
+
+    async def _record_errors(
+        self, jobs: List[Dict[str, Any]], errors: Dict[Tuple[int, int], BaseException]
+    ) -> None:
+        # 일시적 오류는 재시도 한도까지 백오프 후 다시 대기열로, 영구 오류는 실패 처리
+        updates: Dict[Tuple[str, str, Optional[str]], List[int]] = {}
+        # 같은 시도 횟수·오류는 같은 시각으로 묶어 한 번에 갱신
+        retry_times: Dict[Tuple[int, str], str] = {}
+        for job in jobs:
+            error = errors[(job["group_id"], job["user_id"])]
+            retry = (
+                classify_error(error) != ERROR_PERMANENT
+                and job["attempts"] + 1 < OUTBOX_MAX_ATTEMPTS
+            )
+            status = "pending" if retry else "failed"
+            retry_at: Optional[str] = None
+            if retry:
+                key = (job["attempts"], str(error))
+                if key not in retry_times:
+                    retry_times[key] = outbox_timestamp(retry_delay(job["attempts"], error))
+                retry_at = retry_times[key]
+            updates.setdefault((status, str(error), retry_at), []).append(job["id"])
+        for (status, error_text, retry_at), job_ids in updates.items():
+            await update_outbox_jobs(
+                job_ids, status, error_text, increment_attempts=True, next_attempt_at=retry_at
+            )
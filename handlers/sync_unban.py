@@ -0,0 +1,40 @@
+from typing import Dict, List, Optional
+
+from aiogram import Bot
+
+from utils.fanout import Cell, FanoutResult, User, sync_matrix
+
+
+def build_unban_notification(
+    users: List[User], reason: str, origin_chat_title: str
+) -> str:
+    user_text = "\n".join(
+        f"@{username or '알 수 없음'} ({user_id})" for username, user_id in users
+    )
+    reason_text = f"💬: {reason}\n" if reason else ""
+    return (
+        f"✅ 차단 해제\n"
+        f"{user_text}\n"
+        f"{reason_text}"
+        f" ~ {origin_chat_title}에서 연동"
+    )
+
+
+async def unban_in_groups(
+    bot: Bot,
+    cells: List[Cell],
+    usernames: Dict[int, Optional[str]],
+    reason: str,
+    origin_chat_title: str,
+) -> FanoutResult:
+    """(그룹, 사용자) 매트릭스 차단 해제 및 그룹별 통합 알림 전송."""
+    return await sync_matrix(
+        bot,
+        "unban",
+        cells,
+        usernames,
+        lambda group_id, user_id: bot.unban_chat_member(group_id, user_id),
+        build_unban_notification,
+        reason,
+        origin_chat_title,
+    )
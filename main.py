@@ -1,44 +1,288 @@
 import asyncio
-import logging
+import secrets
+import signal
+from contextlib import suppress
+from typing import List, Optional
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
-from config import BOT_TOKEN, LOG_CHANNEL_ID, PUBLIC_LOG_CHANNEL_ID, logger
+from config import (
+    BOT_MODE,
+    BOT_TOKEN,
+    LOG_CHANNEL_ID,
+    METRICS_HOST,
+    METRICS_PORT,
+    PUBLIC_LOG_CHANNEL_ID,
+    WEBHOOK_HOST,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+    log_queue_handler,
+    log_sampler,
+    logger,
+)
+from database.connection import db
+from database.groups import load_registry
+from database.legacy_import import import_legacy_json
 from database.setup import init_db
-from handlers import admin, ban, bot_events, group, kick, mute, unban
-from utils.logger import test_channel_access
-from utils.middleware import ThrottlingMiddleware
+from database.username_cache import username_lru, username_writer
+from handlers import admin, ban, bot_events, group, mute
+from handlers.ban_expiry import ban_expiry
+from handlers.sync_outbox import OutboxWorker
+from utils.cache import MemberCacheMiddleware, log_member_cache_stats, member_cache
+from utils.logger import log_digest, test_channel_access
+from utils.loop_monitor import LoopLagMonitor
+from utils.metrics import ApiMetricsMiddleware, registry, start_metrics_server
+from utils.middleware import (
+    ChatMemberUpdateMiddleware,
+    CommandPrefilterMiddleware,
+    HandlerMetricsMiddleware,
+    ThrottlingMiddleware,
+    TracingMiddleware,
+    UserHarvestMiddleware,
+)
+from utils.retry import RetryMiddleware
+from utils.scheduler import RateLimitMiddleware, api_scheduler
+from utils.storage import count_pending_outbox_jobs
+from utils.tracing import TraceRequestMiddleware, tracer
+
+
+def register_gauges(
+    throttle: ThrottlingMiddleware,
+    harvester: UserHarvestMiddleware,
+    prefilter: Optional[CommandPrefilterMiddleware],
+) -> None:
+    """큐 길이, 캐시 크기와 미들웨어 누적값을 수집 시점에 읽도록 등록."""
+    registry.gauge(
+        "okm3_api_scheduler_queue_depth",
+        "Bot API calls waiting for a rate-limit slot.",
+        callback=lambda: api_scheduler.queue_depth,
+    )
+    registry.gauge(
+        "okm3_outbox_pending_jobs",
+        "Pending or running cross-group sync jobs.",
+        callback=count_pending_outbox_jobs,
+    )
+    registry.gauge(
+        "okm3_log_digest_pending",
+        "Log channel entries waiting to be sent.",
+        callback=lambda: log_digest.pending,
+    )
+    registry.gauge(
+        "okm3_username_write_buffer_pending",
+        "Username cache rows waiting to be written.",
+        callback=lambda: username_writer.pending,
+    )
+    registry.gauge(
+        "okm3_ban_expiry_heap_size",
+        "Upcoming ban expiries held in memory.",
+        callback=lambda: len(ban_expiry),
+    )
+    registry.gauge(
+        "okm3_member_cache_size", "Cached chat members.", callback=lambda: len(member_cache)
+    )
+    registry.counter_callback(
+        "okm3_member_cache_hits_total", "Chat member cache hits.", lambda: member_cache.hits
+    )
+    registry.counter_callback(
+        "okm3_member_cache_misses_total",
+        "Chat member cache misses.",
+        lambda: member_cache.misses,
+    )
+    registry.gauge(
+        "okm3_username_lru_size",
+        "Cached username lookups.",
+        callback=lambda: len(username_lru),
+    )
+    registry.counter_callback(
+        "okm3_throttled_commands_total",
+        "Commands dropped by throttling.",
+        lambda: throttle.dropped,
+    )
+    registry.counter_callback(
+        "okm3_user_harvest_dropped_total",
+        "Profile writes dropped by the harvest rate limit.",
+        lambda: harvester.dropped,
+    )
+    registry.counter_callback(
+        "okm3_log_records_dropped_total",
+        "Log records dropped because the log queue was full.",
+        lambda: log_queue_handler.dropped,
+    )
+    registry.counter_callback(
+        "okm3_traces_exported_total",
+        "Traces written to the trace file.",
+        lambda: tracer.exported,
+    )
+    if prefilter:
+        registry.counter_callback(
+            "okm3_prefilter_skipped_total",
+            "Non-command messages skipped before routing.",
+            lambda: prefilter.skipped,
+        )
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, allowed_updates: List[str]) -> None:
+    """aiohttp 서버로 웹훅 업데이트 수신. 종료 신호까지 실행 후 웹훅 삭제."""
+    secret = WEBHOOK_SECRET
+    if not secret:
+        secret = secrets.token_urlsafe(32)
+        logger.warning("webhook_secret_generated")
+
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=secret).register(
+        app, path=WEBHOOK_PATH
+    )
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app, handle_signals=False)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT)
+    await site.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await bot.set_webhook(
+            f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+            secret_token=secret,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=allowed_updates,
+        )
+        logger.info(
+            "webhook_started",
+            url=f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+            host=WEBHOOK_HOST,
+            port=WEBHOOK_PORT,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+        )
+        await stop.wait()
+    finally:
+        try:
+            await bot.delete_webhook()
+        except Exception as e:
+            logger.error("delete_webhook_failed", error=str(e))
+        await runner.cleanup()
+        logger.info("webhook_stopped")
 
 
 async def main():
-    logging.basicConfig(level=logging.INFO)
+    # 루프를 막는 콜백을 찾기 위한 지연 감시
+    loop_monitor = LoopLagMonitor()
+    await loop_monitor.start()
+
     bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode="HTML"))
     dp = Dispatcher()
 
-    # 데이터베이스 초기화
+    # 모든 Bot API 호출은 재시도 계층과 전역 스케줄러를 거친다
+    # 가장 바깥: trace span은 대기와 재시도까지 포함
+    bot.session.middleware(TraceRequestMiddleware())
+    bot.session.middleware(RetryMiddleware(api_scheduler))
+    bot.session.middleware(RateLimitMiddleware(api_scheduler))
+    bot.session.middleware(MemberCacheMiddleware(member_cache))
+    # 가장 안쪽: 재시도마다 실제 요청 시간 측정
+    bot.session.middleware(ApiMetricsMiddleware())
+    await api_scheduler.start()
+
+    # 데이터베이스 연결 및 초기화
+    await db.start()
     await init_db()
+    await import_legacy_json()
+    await load_registry()
+
+    # 그룹 연동 작업 워커 (미완료 작업 재개)
+    outbox_worker = OutboxWorker(bot)
+    await outbox_worker.start()
+    # 기간 차단 만료 처리 (중지 중 지난 만료 포함)
+    await ban_expiry.start(bot)
 
     # 채널 접근 테스트
     await test_channel_access(bot, LOG_CHANNEL_ID)
     await test_channel_access(bot, PUBLIC_LOG_CHANNEL_ID)
 
     # 미들웨어 및 핸들러 등록
-    dp.message.middleware(ThrottlingMiddleware(limit=1.0))
+    harvester = UserHarvestMiddleware()
+    dp.message.outer_middleware(harvester)
+    dp.chat_member.outer_middleware(harvester)
+    throttle = ThrottlingMiddleware()
+    dp.message.middleware(throttle)
+    handler_metrics = HandlerMetricsMiddleware()
+    dp.message.middleware(handler_metrics)
+    dp.chat_member.middleware(handler_metrics)
+    dp.my_chat_member.middleware(handler_metrics)
+    dp.chat_member.outer_middleware(ChatMemberUpdateMiddleware(member_cache))
+    dp.my_chat_member.outer_middleware(ChatMemberUpdateMiddleware(member_cache))
     dp.include_router(admin.router)
     dp.include_router(ban.router)
-    dp.include_router(kick.router)
-    dp.include_router(unban.router)
     dp.include_router(group.router)
     dp.include_router(bot_events.router)
     dp.include_router(mute.router)
 
-    # 폴링 시작
+    # 명령어가 아닌 메시지는 수집 미들웨어 이후 바로 종료
+    prefilter = CommandPrefilterMiddleware.from_router(dp)
+    if prefilter:
+        dp.message.outer_middleware(prefilter)
+        logger.info(
+            "command_prefilter_enabled",
+            commands={prefix: sorted(names) for prefix, names in prefilter.commands.items()},
+        )
+    # 사전 필터를 통과한 명령어만 trace
+    dp.message.outer_middleware(TracingMiddleware())
+
+    # 지표 수집 엔드포인트
+    register_gauges(throttle, harvester, prefilter)
+    metrics_runner = None
+    if METRICS_PORT:
+        metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+
+    # 업데이트 수신 시작 (폴링 또는 웹훅)
     try:
-        await dp.start_polling(bot)
+        # 멤버 캐시 무효화를 위해 my_chat_member 업데이트도 수신
+        allowed_updates = dp.resolve_used_update_types()
+        if "my_chat_member" not in allowed_updates:
+            allowed_updates.append("my_chat_member")
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot, allowed_updates)
+        else:
+            # 웹훅 모드에서 전환한 경우 남아 있는 웹훅 제거
+            await bot.delete_webhook()
+            await dp.start_polling(bot, allowed_updates=allowed_updates)
     except Exception as e:
-        logger.error("polling_error", error=str(e))
+        logger.error(f"{BOT_MODE}_error", error=str(e))
         raise
+    finally:
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        await ban_expiry.stop()
+        await outbox_worker.stop()
+        await log_digest.close()
+        await tracer.close()
+        await username_writer.close()
+        log_member_cache_stats()
+        logger.info(
+            "user_harvest_stats", recorded=harvester.recorded, dropped=harvester.dropped
+        )
+        if prefilter:
+            logger.info(
+                "command_prefilter_stats",
+                passed=prefilter.passed,
+                skipped=prefilter.skipped,
+            )
+        await api_scheduler.stop()
+        await db.close()
+        await loop_monitor.stop()
+        log_sampler.flush()
+        # 위 단계(로그 전송 등)가 세션을 다시 열 수 있으므로 마지막에 닫는다
+        await bot.session.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+import pytest_asyncio
+
+# config는 import 시 필수 환경 변수를 검사하고 로그 파일을 연다
+os.environ.setdefault("BOT_TOKEN", "123456:test")
+os.environ.setdefault("MASTER_ADMIN_IDS", "1")
+os.environ.setdefault("LOG_CHANNEL_ID", "-1001")
+os.environ.setdefault("PUBLIC_LOG_CHANNEL_ID", "-1002")
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "okm3-test.log"))
+os.environ.setdefault("TRACE_FILE", os.path.join(tempfile.gettempdir(), "okm3-test-traces.jsonl"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    """임시 파일에 마이그레이션까지 적용한 전역 db."""
+    from database.connection import db
+    from database.setup import init_db
+
+    db.path = str(tmp_path / "bot.db")
+    db.checkpoint_interval = 0
+    await db.start()
+    await init_db()
+    yield db
+    await db.close()
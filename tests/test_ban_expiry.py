@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiogram.types import Chat, Message
+
+from database.groups import load_registry, save_groups
+from handlers.ban_expiry import BanExpiryScheduler, expiry_timestamp
+from utils.common import extract_user_info
+from utils.storage import fetch_query, upsert_banned_users
+
+
+def at(**delta):
+    return expiry_timestamp(datetime.now(timezone.utc) + timedelta(**delta))
+
+
+async def ban(*bans):
+    await upsert_banned_users(
+        {
+            user_id: {"username": f"u{user_id}", "chat_id": -1, "expires_at": expires_at}
+            for user_id, expires_at in bans
+        }
+    )
+
+
+def message(text):
+    return Message(
+        message_id=1,
+        date=datetime.now(),
+        chat=Chat(id=-1, type="supergroup"),
+        text=text,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text, user_ids, duration, reason",
+    [
+        (".ban 10 11 7d spam here", [10, 11], timedelta(days=7), "spam here"),
+        (".ban 10 spam 7d", [10], None, "spam 7d"),
+        (".ban 10 1h30m 2d", [10], timedelta(hours=1, minutes=30), "2d"),
+        (".ban 10", [10], None, ""),
+    ],
+)
+async def test_duration_only_directly_after_targets(text, user_ids, duration, reason):
+    user_info = await extract_user_info(message(text), bot=None, with_duration=True)
+    assert (user_info["user_ids"], user_info["duration"], user_info["reason"]) == (
+        user_ids,
+        duration,
+        reason,
+    )
+
+
+@pytest.mark.asyncio
+async def test_duration_is_plain_reason_without_flag():
+    user_info = await extract_user_info(message(".unban 10 7d spam"), bot=None)
+    assert (user_info["duration"], user_info["reason"]) == (None, "7d spam")
+
+
+@pytest.mark.asyncio
+async def test_load_keeps_earliest_batch_and_sets_horizon(database):
+    a, b, c = at(hours=1), at(hours=2), at(hours=3)
+    await ban((10, c), (11, a), (12, b))
+    scheduler = BanExpiryScheduler(batch_size=2)
+
+    await scheduler._load()
+    assert sorted(scheduler._heap) == [(a, 11), (b, 12)]
+    assert scheduler._horizon == b
+    # 로드 범위 밖은 heap에 넣지 않고, 범위 안이면 넣는다
+    scheduler.schedule(13, at(hours=4))
+    scheduler.schedule(14, at(minutes=30))
+    assert len(scheduler) == 3
+    assert scheduler._heap[0][1] == 14
+
+
+@pytest.mark.asyncio
+async def test_drained_heap_reloads_beyond_horizon(database):
+    a, b, c = at(hours=1), at(hours=2), at(hours=3)
+    await ban((10, a), (11, b), (12, c))
+    scheduler = BanExpiryScheduler(batch_size=2)
+    await scheduler._load()
+    assert scheduler._horizon == b
+
+    # heap의 항목이 모두 빠졌지만 horizon 이후 항목이 DB에 남아 있는 상태
+    await database.execute("DELETE FROM banned_users WHERE user_id IN (10, 11)")
+    scheduler._heap.clear()
+    task = asyncio.create_task(scheduler._run())
+    try:
+        for _ in range(50):
+            if scheduler._heap:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    assert scheduler._heap == [(c, 12)]
+    assert scheduler._horizon is None
+
+
+@pytest.mark.asyncio
+async def test_expired_bans_enqueue_unbans_and_are_removed(database):
+    await save_groups({-1: {"title": "G1"}, -2: {"title": "G2"}})
+    await load_registry()
+    later = at(hours=1)
+    await ban((10, at(seconds=-5)), (11, later))
+    scheduler = BanExpiryScheduler(batch_size=10)
+    await scheduler._load()
+
+    await scheduler._expire_due()
+    assert await fetch_query("SELECT user_id FROM banned_users") == [(11,)]
+    jobs = await fetch_query(
+        "SELECT group_id, user_id, action, origin_title FROM sync_outbox ORDER BY group_id"
+    )
+    assert jobs == [(-2, 10, "unban", "G1"), (-1, 10, "unban", "G1")]
+    assert scheduler._heap == [(later, 11)]
+
+
+@pytest.mark.asyncio
+async def test_failed_expiry_leaves_no_outbox_jobs(database):
+    await save_groups({-1: {"title": "G1"}})
+    await load_registry()
+    await ban((10, at(seconds=-5)))
+    await database.execute(
+        "CREATE TRIGGER fail_delete BEFORE DELETE ON banned_users "
+        "BEGIN SELECT RAISE(ABORT, 'boom'); END"
+    )
+    scheduler = BanExpiryScheduler(batch_size=10)
+
+    with pytest.raises(Exception, match="boom"):
+        await scheduler._expire_due()
+    # 삭제가 실패하면 해제 작업도 기록되지 않아 재시도 시 중복이 생기지 않는다
+    assert await fetch_query("SELECT COUNT(*) FROM sync_outbox") == [(0,)]
+    assert await fetch_query("SELECT user_id FROM banned_users") == [(10,)]
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from database.connection import ConnectionManager
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "test.db"), read_pool_size=2, checkpoint_interval=0)
+    await manager.start()
+    yield manager
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_borrowed_readers(manager):
+    borrowed = asyncio.Event()
+
+    async def slow_read():
+        async with manager.reader() as conn:
+            borrowed.set()
+            await asyncio.sleep(0.1)
+            cursor = await conn.execute("SELECT 1")
+            row = await cursor.fetchone()
+            await cursor.close()
+            return row
+
+    task = asyncio.create_task(slow_read())
+    await borrowed.wait()
+    await manager.close()
+
+    assert tuple(await task) == (1,)
+    assert not manager.started
+
+
+@pytest.mark.asyncio
+async def test_queries_after_close_do_not_reopen(manager):
+    await manager.close()
+
+    with pytest.raises(RuntimeError):
+        await manager.fetchall("SELECT 1")
+    with pytest.raises(RuntimeError):
+        await manager.execute("SELECT 1")
+    assert not manager.started
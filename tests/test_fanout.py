@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError
+from aiogram.methods import BanChatMember
+
+from handlers.ban import summarize_result
+from utils.fanout import FanoutResult, build_matrix, run_fanout
+
+METHOD = BanChatMember(chat_id=-1, user_id=1)
+
+
+def test_build_matrix_is_user_major():
+    assert build_matrix([-1, -2], [10, 11]) == [(-1, 10), (-2, 10), (-1, 11), (-2, 11)]
+
+
+@pytest.mark.asyncio
+async def test_chat_level_error_skips_rest_of_group():
+    calls = []
+
+    async def call(group_id, user_id):
+        calls.append((group_id, user_id))
+        if group_id == -1:
+            raise TelegramForbiddenError(METHOD, "bot was kicked")
+        return user_id
+
+    cells = build_matrix([-1, -2], [10, 11, 12])
+    result = await run_fanout(cells, call, concurrency=1)
+
+    assert [cell for cell in calls if cell[0] == -1] == [(-1, 10)]
+    assert set(result.errors) == {(-1, 10), (-1, 11), (-1, 12)}
+    assert result.values == {(-2, 10): 10, (-2, 11): 11, (-2, 12): 12}
+
+
+@pytest.mark.asyncio
+async def test_per_group_concurrency_is_bounded():
+    running = {}
+    peak = {}
+
+    async def call(group_id, user_id):
+        running[group_id] = running.get(group_id, 0) + 1
+        peak[group_id] = max(peak.get(group_id, 0), running[group_id])
+        await asyncio.sleep(0.01)
+        running[group_id] -= 1
+
+    await run_fanout(build_matrix([-1, -2], range(10)), call, concurrency=8, per_group=2)
+    assert peak == {-1: 2, -2: 2}
+
+
+def test_summarize_result_separates_skips_from_failures():
+    cells = [(-1, 10), (-1, 11), (-1, 12), (-1, 13)]
+    result = FanoutResult(
+        values={(-1, 10): ("alice", 10), (-1, 11): None},
+        errors={
+            (-1, 12): TelegramNetworkError(METHOD, "timeout"),
+            (-1, 13): TelegramForbiddenError(METHOD, "bot was kicked"),
+        },
+    )
+
+    success, skipped, failed = summarize_result(cells, result, "process_ban_error")
+
+    assert success == [("alice", 10)]
+    assert skipped == ["11"]
+    assert failed == ["12 (transient)", "13 (chat)"]
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from database import legacy_import
+from database.legacy_import import iter_json_object
+
+SAMPLE = (
+    '{"5": 1, "6": -1.25e10, "7": "s", "8": {"a": [1, 2.5]}, '
+    '"9": true, "10": null, "11": 0.5E-3}'
+)
+
+
+async def _collect(path: str) -> list:
+    return [item async for item in iter_json_object(path)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", range(1, len(SAMPLE) + 2))
+async def test_iter_json_object_any_chunk_size(tmp_path, monkeypatch, chunk_size):
+    path = tmp_path / "data.json"
+    path.write_text(SAMPLE, encoding="utf-8")
+    monkeypatch.setattr(legacy_import, "CHUNK_SIZE", chunk_size)
+
+    assert await _collect(str(path)) == list(json.loads(SAMPLE).items())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 3, 64 * 1024])
+async def test_iter_json_object_rejects_truncated_file(tmp_path, monkeypatch, chunk_size):
+    path = tmp_path / "data.json"
+    path.write_text('{"5": 1, "6": -1.', encoding="utf-8")
+    monkeypatch.setattr(legacy_import, "CHUNK_SIZE", chunk_size)
+
+    with pytest.raises(ValueError):
+        await _collect(str(path))
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendMessage
+
+from utils.logger import DIGEST_SEPARATOR, LogDigest, truncate_html, visible_length
+
+
+class FakeBot:
+    def __init__(self, reject=()):
+        self.sent = []
+        self.reject = reject
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        if any(marker in text for marker in self.reject):
+            raise TelegramBadRequest(SendMessage(chat_id=chat_id, text=text), "can't parse entities")
+        self.sent.append((chat_id, text))
+
+
+def test_visible_length_ignores_tags_and_counts_entities_once():
+    assert visible_length("<b>a&amp;b</b>") == 3
+
+
+def test_truncate_closes_open_tags_without_cutting_entities():
+    text = "<b>hello <i>world</i> &amp; more</b>"
+    assert truncate_html(text, 9) == "<b>hello <i>wo…</i></b>"
+    assert truncate_html("<b>a&amp;b</b>", 3) == "<b>a&amp;b</b>"
+    cut = truncate_html("&lt;" * 10, 5)
+    assert cut == "&lt;" * 4 + "…"
+    assert visible_length(cut) == 5
+
+
+@pytest.mark.asyncio
+async def test_entries_within_window_are_sent_as_one_message():
+    bot = FakeBot()
+    digest = LogDigest(window=0.01)
+    digest.add(bot, -1, "a")
+    digest.add(bot, -1, "b")
+    digest.add(bot, -2, "c")
+    assert digest.pending == 3
+
+    await asyncio.sleep(0.05)
+    await digest.flush()
+    assert sorted(bot.sent) == [(-2, "c"), (-1, f"a{DIGEST_SEPARATOR}b")]
+    assert digest.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_size_limit_flushes_before_overflow():
+    bot = FakeBot()
+    digest = LogDigest(window=60, limit=10)
+    digest.add(bot, -1, "<b>aaaa</b>")
+    digest.add(bot, -1, "<b>bbbb</b>")
+    digest.add(bot, -1, "cccc")
+
+    await digest.flush()
+    assert bot.sent == [
+        (-1, f"<b>aaaa</b>{DIGEST_SEPARATOR}<b>bbbb</b>"),
+        (-1, "cccc"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bad_entry_is_dropped_alone():
+    bot = FakeBot(reject=("<bad>",))
+    digest = LogDigest(window=60)
+    digest.add(bot, -1, "a")
+    digest.add(bot, -1, "<bad>")
+    digest.add(bot, -1, "b")
+
+    await digest.flush()
+    assert bot.sent == [(-1, "a"), (-1, "b")]
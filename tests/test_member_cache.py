@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from utils.cache import ChatMemberCache
+
+
+class SlowBot:
+    """get_chat_member 호출을 release() 전까지 붙잡아 두는 가짜 봇."""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = asyncio.Event()
+
+    async def get_chat_member(self, chat_id, user_id):
+        self.calls += 1
+        call = self.calls
+        await self.gate.wait()
+        return ("member", chat_id, user_id, call)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_share_one_call():
+    bot, cache = SlowBot(), ChatMemberCache(ttl=60, maxsize=10)
+    tasks = [asyncio.create_task(cache.fetch(bot, -1, 10)) for _ in range(3)]
+    await settle()
+    bot.gate.set()
+
+    results = await asyncio.gather(*tasks)
+    assert bot.calls == 1
+    assert results == [("member", -1, 10, 1)] * 3
+    assert await cache.fetch(bot, -1, 10) == ("member", -1, 10, 1)
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_error_reaches_waiters_and_is_not_cached():
+    class FailingBot:
+        calls = 0
+
+        async def get_chat_member(self, chat_id, user_id):
+            self.calls += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+    bot, cache = FailingBot(), ChatMemberCache(ttl=60, maxsize=10)
+    results = await asyncio.gather(
+        cache.fetch(bot, -1, 10), cache.fetch(bot, -1, 10), return_exceptions=True
+    )
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert bot.calls == 1
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_first_caller_lets_waiters_refetch_once():
+    bot, cache = SlowBot(), ChatMemberCache(ttl=60, maxsize=10)
+    first = asyncio.create_task(cache.fetch(bot, -1, 10))
+    await settle()
+    waiters = [asyncio.create_task(cache.fetch(bot, -1, 10)) for _ in range(2)]
+    await settle()
+
+    first.cancel()
+    await settle()
+    bot.gate.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    results = await asyncio.gather(*waiters)
+    # 대기자 둘은 새 조회 1회를 함께 기다린다
+    assert bot.calls == 2
+    assert results == [("member", -1, 10, 2)] * 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_fetch():
+    bot, cache = SlowBot(), ChatMemberCache(ttl=60, maxsize=10)
+    first = asyncio.create_task(cache.fetch(bot, -1, 10))
+    await settle()
+    waiter = asyncio.create_task(cache.fetch(bot, -1, 10))
+    await settle()
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    bot.gate.set()
+
+    assert await first == ("member", -1, 10, 1)
+    assert bot.calls == 1
+
+
+def test_lru_eviction_and_ttl():
+    cache = ChatMemberCache(ttl=60, maxsize=2)
+    cache.set(-1, 1, "a")
+    cache.set(-1, 2, "b")
+    assert cache.get(-1, 1) == "a"
+    cache.set(-1, 3, "c")
+    assert cache.get(-1, 2) is None
+    assert cache.evictions == 1
+
+    expired = ChatMemberCache(ttl=0, maxsize=2)
+    expired.set(-1, 1, "a")
+    assert expired.get(-1, 1) is None
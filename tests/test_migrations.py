@@ -0,0 +1,35 @@
+import pytest
+
+from database import migrations
+from database.connection import db
+from utils.storage import fetch_query
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """integer_keys 이전(TEXT 키) 스키마까지만 적용하는 db."""
+    db.path = str(tmp_path / "legacy.db")
+    db.checkpoint_interval = 0
+    return db
+
+
+@pytest.mark.asyncio
+async def test_integer_keys_keeps_only_whole_integers(legacy_db, monkeypatch):
+    full = list(migrations.MIGRATIONS)
+    await legacy_db.start()
+    try:
+        monkeypatch.setattr(migrations, "MIGRATIONS", full[:1])
+        await migrations.run_migrations()
+        keys = ["12", " 13 ", "-100", "12abc", "-", "", "abc", "1-2", "--5", "-7x"]
+        for key in keys:
+            await legacy_db.execute(
+                "INSERT INTO banned_users (user_id, username) VALUES (?, ?)", (key, key)
+            )
+
+        monkeypatch.setattr(migrations, "MIGRATIONS", full)
+        await migrations.run_migrations()
+        rows = await fetch_query("SELECT user_id, username FROM banned_users ORDER BY user_id")
+    finally:
+        await legacy_db.close()
+
+    assert rows == [(-100, "-100"), (12, "12"), (13, " 13 ")]
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest, TelegramNetworkError, TelegramRetryAfter
+from aiogram.methods import BanChatMember
+
+from database.outbox import ACTION_BAN, enqueue_sync
+from handlers import sync_outbox
+from handlers.sync_outbox import OutboxWorker, retry_delay
+from utils.fanout import FanoutResult
+from utils.storage import claim_outbox_jobs, fetch_query
+
+METHOD = BanChatMember(chat_id=-2, user_id=10)
+
+
+async def rows():
+    return await fetch_query(
+        "SELECT group_id, status, attempts, next_attempt_at FROM sync_outbox ORDER BY id"
+    )
+
+
+def failing(error):
+    async def sync(bot, cells, usernames, reason, origin_title):
+        return FanoutResult(values={}, errors={cell: error for cell in cells})
+
+    return sync
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(sync_outbox, "OUTBOX_MAX_ATTEMPTS", 3)
+    return OutboxWorker(bot=None)
+
+
+@pytest.mark.asyncio
+async def test_claim_marks_jobs_running_once(database):
+    await enqueue_sync(ACTION_BAN, [-2, -3], [("u", 10)], "spam", "G1")
+
+    jobs = await claim_outbox_jobs(10)
+    assert [(job["group_id"], job["user_id"]) for job in jobs] == [(-2, 10), (-3, 10)]
+    assert [row[1] for row in await rows()] == ["running", "running"]
+    assert await claim_outbox_jobs(10) == []
+
+
+@pytest.mark.asyncio
+async def test_success_marks_jobs_done(database, worker, monkeypatch):
+    async def ok(bot, cells, usernames, reason, origin_title):
+        return FanoutResult(values={cell: None for cell in cells}, errors={})
+
+    monkeypatch.setitem(sync_outbox.SYNC_ACTIONS, ACTION_BAN, ok)
+    await enqueue_sync(ACTION_BAN, [-2], [("u", 10)], "spam", "G1")
+
+    assert await worker._drain_once()
+    assert await rows() == [(-2, "done", 1, None)]
+
+
+@pytest.mark.asyncio
+async def test_transient_error_backs_off_before_retry(database, worker, monkeypatch):
+    error = TelegramNetworkError(METHOD, "timeout")
+    monkeypatch.setitem(sync_outbox.SYNC_ACTIONS, ACTION_BAN, failing(error))
+    await enqueue_sync(ACTION_BAN, [-2], [("u", 10)], "spam", "G1")
+
+    assert await worker._drain_once()
+    [(_, status, attempts, next_attempt_at)] = await rows()
+    assert (status, attempts) == ("pending", 1)
+    assert datetime.fromisoformat(next_attempt_at) > datetime.now(timezone.utc)
+    # 재시도 시각 전에는 다시 가져가지 않는다
+    assert not await worker._drain_once()
+
+    past = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    await database.execute("UPDATE sync_outbox SET next_attempt_at = ?", (past,))
+    assert await worker._drain_once()
+    assert (await rows())[0][1:3] == ("pending", 2)
+
+
+@pytest.mark.asyncio
+async def test_transient_error_fails_at_attempt_limit(database, worker, monkeypatch):
+    error = TelegramNetworkError(METHOD, "timeout")
+    monkeypatch.setitem(sync_outbox.SYNC_ACTIONS, ACTION_BAN, failing(error))
+    await enqueue_sync(ACTION_BAN, [-2], [("u", 10)], "spam", "G1")
+
+    for _ in range(3):
+        await database.execute("UPDATE sync_outbox SET next_attempt_at = NULL")
+        await worker._drain_once()
+    assert await rows() == [(-2, "failed", 3, None)]
+
+
+@pytest.mark.asyncio
+async def test_permanent_error_fails_immediately(database, worker, monkeypatch):
+    error = TelegramBadRequest(METHOD, "user not found")
+    monkeypatch.setitem(sync_outbox.SYNC_ACTIONS, ACTION_BAN, failing(error))
+    await enqueue_sync(ACTION_BAN, [-2], [("u", 10)], "spam", "G1")
+
+    assert await worker._drain_once()
+    assert await rows() == [(-2, "failed", 1, None)]
+
+
+def test_retry_delay_grows_and_honours_retry_after(monkeypatch):
+    # jitter 없이 상한 값만 사용
+    monkeypatch.setattr(
+        sync_outbox, "backoff_delay", lambda attempt, base, cap: min(cap, base * 2**attempt)
+    )
+    error = TelegramNetworkError(METHOD, "timeout")
+    assert retry_delay(0, error) < retry_delay(3, error) <= sync_outbox.OUTBOX_RETRY_MAX_DELAY
+    assert retry_delay(0, TelegramRetryAfter(METHOD, "flood", 900)) == 900
@@ -0,0 +1,103 @@
+import re
+from datetime import datetime
+
+import pytest
+from aiogram import Dispatcher, F, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.filters import Command
+from aiogram.types import Chat, Message, User
+
+from utils.middleware import CommandPrefilterMiddleware
+
+
+def message(text=None, caption=None):
+    return Message(
+        message_id=1,
+        date=datetime.now(),
+        chat=Chat(id=-1, type="supergroup"),
+        from_user=User(id=10, is_bot=False, first_name="u"),
+        text=text,
+        caption=caption,
+    )
+
+
+async def handler(event, data):
+    return "handled"
+
+
+def router_with(*filters):
+    router = Router()
+
+    @router.message(*filters)
+    async def callback(message):
+        pass
+
+    return router
+
+
+def test_collects_commands_by_prefix():
+    dp = Dispatcher()
+    dp.include_router(router_with(Command("Ban", "unban", prefix=".")))
+    dp.include_router(router_with(Command("mute", prefix="./")))
+
+    prefilter = CommandPrefilterMiddleware.from_router(dp)
+    assert prefilter.commands == {
+        ".": frozenset({"ban", "unban", "mute"}),
+        "/": frozenset({"mute"}),
+    }
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        (F.text,),
+        (Command(re.compile(r"ban\d*"), prefix="."),),
+    ],
+)
+def test_unfilterable_handlers_disable_prefilter(filters):
+    dp = Dispatcher()
+    dp.include_router(router_with(Command("ban", prefix=".")))
+    dp.include_router(router_with(*filters))
+
+    assert CommandPrefilterMiddleware.from_router(dp) is None
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (".ban 123 spam", True),
+        (".BAN", True),
+        (".ban@okm3_bot 123", True),
+        ("/ban", False),
+        (".banana", False),
+        (". ban", False),
+        (".", False),
+        ("hello .ban", False),
+        ("", False),
+    ],
+)
+def test_is_command(text, expected):
+    prefilter = CommandPrefilterMiddleware({".": frozenset({"ban"})})
+    assert prefilter.is_command(message(text)) is expected
+
+
+@pytest.mark.asyncio
+async def test_non_commands_stop_before_handlers():
+    prefilter = CommandPrefilterMiddleware({".": frozenset({"ban"})})
+
+    assert await prefilter(handler, message("hello"), {}) is UNHANDLED
+    assert await prefilter(handler, message(caption=".ban 1"), {}) == "handled"
+    assert await prefilter(handler, message(".ban 1"), {}) == "handled"
+    assert (prefilter.passed, prefilter.skipped) == (2, 1)
+
+
+def test_bot_routers_are_filterable():
+    from handlers import admin, ban, bot_events, group, mute
+
+    dp = Dispatcher()
+    for module in (admin, ban, bot_events, group, mute):
+        dp.include_router(module.router)
+
+    prefilter = CommandPrefilterMiddleware.from_router(dp)
+    assert prefilter is not None
+    assert prefilter.is_command(message(".ban 123"))
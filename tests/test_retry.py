@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.methods import BanChatMember, GetChatMember, SendMessage
+
+from utils import retry as retry_module
+from utils.retry import (
+    ERROR_PERMANENT,
+    ERROR_RETRY_AFTER,
+    ERROR_TRANSIENT,
+    RetryMiddleware,
+    backoff_delay,
+    classify_error,
+    is_retryable,
+)
+from utils.scheduler import ApiScheduler
+
+SEND = SendMessage(chat_id=-100, text="hi")
+BAN = BanChatMember(chat_id=-100, user_id=1)
+
+
+def network_error(method=SEND):
+    return TelegramNetworkError(method=method, message="timeout")
+
+
+class FlakyRequest:
+    """주어진 오류를 차례로 던진 뒤 성공하는 make_request."""
+
+    def __init__(self, *errors: BaseException):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self, bot, method):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(retry_module, "backoff_delay", lambda attempt: 0.0)
+
+
+def test_classify_error():
+    assert classify_error(TelegramRetryAfter(SEND, "flood", 3)) == ERROR_RETRY_AFTER
+    assert classify_error(network_error()) == ERROR_TRANSIENT
+    assert classify_error(asyncio.TimeoutError()) == ERROR_TRANSIENT
+    assert classify_error(TelegramServerError(SEND, "bad gateway")) == ERROR_TRANSIENT
+    assert classify_error(TelegramBadRequest(SEND, "chat not found")) == ERROR_PERMANENT
+
+
+def test_network_errors_retry_only_idempotent_methods():
+    assert is_retryable(BAN, network_error(BAN))
+    assert is_retryable(GetChatMember(chat_id=-100, user_id=1), asyncio.TimeoutError())
+    assert not is_retryable(SEND, network_error())
+    assert is_retryable(SEND, TelegramServerError(SEND, "bad gateway"))
+    assert is_retryable(SEND, TelegramRetryAfter(SEND, "flood", 1))
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(20):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4) <= 4
+
+
+@pytest.mark.asyncio
+async def test_send_message_is_not_retried_after_timeout():
+    request = FlakyRequest(network_error())
+    with pytest.raises(TelegramNetworkError):
+        await RetryMiddleware(attempts=5)(request, None, SEND)
+    assert request.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_ban_is_retried_after_timeout():
+    request = FlakyRequest(network_error(BAN), network_error(BAN))
+    assert await RetryMiddleware(attempts=5)(request, None, BAN) == "ok"
+    assert request.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_stops_at_attempt_limit():
+    request = FlakyRequest(*[TelegramServerError(SEND, "bad gateway")] * 5)
+    with pytest.raises(TelegramServerError):
+        await RetryMiddleware(attempts=3)(request, None, SEND)
+    assert request.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_chat_retry_after_pauses_only_that_chat():
+    scheduler = ApiScheduler()
+    request = FlakyRequest(TelegramRetryAfter(SEND, "flood", 0))
+    assert await RetryMiddleware(scheduler, attempts=3)(request, None, SEND) == "ok"
+
+    assert -100 in scheduler._chat_paused_until
+    assert scheduler._paused_until == 0.0
+
+
+@pytest.mark.asyncio
+async def test_wait_chat_blocks_only_the_paused_chat():
+    scheduler = ApiScheduler()
+    scheduler.pause(0.1, chat_id=-100)
+
+    await asyncio.wait_for(scheduler.wait_chat(-200), 0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(scheduler.wait_chat(-100), 0.02)
+    await asyncio.wait_for(scheduler.wait_chat(-100), 0.5)
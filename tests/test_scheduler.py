@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils import scheduler as scheduler_module
+from utils.scheduler import (
+    MAX_CHAT_BUCKETS,
+    PRIORITY_LOG,
+    PRIORITY_MODERATION,
+    PRIORITY_NOTIFICATION,
+    ApiScheduler,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_token_bucket_burst_then_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0
+    # 오래 쉬어도 capacity 이상 쌓이지 않는다
+    clock.now += 60
+    assert [bucket.try_acquire() for _ in range(4)][-1] > 0
+
+
+def test_token_bucket_refund_is_capped(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    bucket.refund()
+    assert bucket.tokens == 2
+    bucket.try_acquire()
+    bucket.refund()
+    assert bucket.tokens == 2
+
+
+def test_chat_buckets_are_bounded():
+    scheduler = ApiScheduler()
+    for chat_id in range(MAX_CHAT_BUCKETS + 5):
+        scheduler._chat_bucket(chat_id)
+    assert len(scheduler._chat_buckets) == MAX_CHAT_BUCKETS
+    assert 0 not in scheduler._chat_buckets
+
+
+@pytest.mark.asyncio
+async def test_dispatch_order_follows_priority():
+    scheduler = ApiScheduler(global_rate=1000, global_burst=1)
+    await scheduler.start()
+    order = []
+
+    async def call(name: str, priority: int) -> None:
+        await scheduler.acquire(priority)
+        order.append(name)
+
+    # 일시 중지 동안 쌓인 요청은 우선순위 순서로 풀린다
+    scheduler.pause(0.05)
+    tasks = [
+        asyncio.create_task(call("log", PRIORITY_LOG)),
+        asyncio.create_task(call("notify", PRIORITY_NOTIFICATION)),
+        asyncio.create_task(call("ban", PRIORITY_MODERATION)),
+    ]
+    await asyncio.wait_for(asyncio.gather(*tasks), 2)
+    await scheduler.stop()
+
+    assert order == ["ban", "notify", "log"]
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_queued_callers():
+    scheduler = ApiScheduler(global_rate=0.001, global_burst=1)
+    await scheduler.start()
+    await scheduler.acquire(PRIORITY_MODERATION)
+    waiter = asyncio.create_task(scheduler.acquire(PRIORITY_MODERATION))
+    await asyncio.sleep(0.01)
+    assert scheduler.queue_depth == 1
+
+    await scheduler.stop()
+    await asyncio.wait_for(waiter, 1)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_consume_token():
+    scheduler = ApiScheduler(global_rate=20, global_burst=1)
+    await scheduler.start()
+    await scheduler.acquire(PRIORITY_MODERATION)
+    cancelled = asyncio.create_task(scheduler.acquire(PRIORITY_MODERATION))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+
+    # 취소된 대기자 몫의 토큰은 다음 호출자가 받는다
+    await asyncio.wait_for(scheduler.acquire(PRIORITY_MODERATION), 1)
+    await scheduler.stop()
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+from aiogram.types import Chat, Message, User
+
+from utils.middleware import SlidingWindowLimiter, ThrottlingMiddleware
+
+
+class FakeBot:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, method):
+        self.calls.append(method)
+
+
+def message(text, user_id=10, chat_id=-1, bot=None):
+    return Message(
+        message_id=1,
+        date=datetime.now(),
+        chat=Chat(id=chat_id, type="supergroup"),
+        from_user=User(id=user_id, is_bot=False, first_name="u"),
+        text=text,
+    ).as_(bot)
+
+
+async def handler(event, data):
+    return "handled"
+
+
+def test_window_slides():
+    limiter = SlidingWindowLimiter(limit=2, window=10)
+    limiter.record(1, 0)
+    limiter.record(1, 5)
+    assert not limiter.allowed(1, 9)
+    # 첫 기록이 창 밖으로 나가면 다시 허용
+    assert limiter.allowed(1, 10)
+
+
+def test_idle_and_excess_keys_are_evicted():
+    limiter = SlidingWindowLimiter(limit=1, window=10, max_keys=2)
+    limiter.record(1, 0)
+    limiter.record(2, 1)
+    limiter.allowed(3, 5)
+    assert len(limiter) == 2
+    limiter.record(3, 5)
+    limiter.allowed(3, 5)
+    assert len(limiter) == 2
+    limiter.allowed(3, 11.5)
+    assert len(limiter) == 1
+
+
+@pytest.mark.asyncio
+async def test_user_limit_drops_and_notifies_once():
+    bot = FakeBot()
+    middleware = ThrottlingMiddleware(user_limit=2, chat_limit=100, window=60)
+
+    results = [await middleware(handler, message(".ban 1", bot=bot), {}) for _ in range(4)]
+    assert results == ["handled", "handled", None, None]
+    assert middleware.dropped == 2
+    assert len(bot.calls) == 1
+    assert await middleware(handler, message(".ban 1", user_id=11, bot=bot), {}) == "handled"
+
+
+@pytest.mark.asyncio
+async def test_chat_limit_applies_across_users():
+    bot = FakeBot()
+    middleware = ThrottlingMiddleware(user_limit=100, chat_limit=2, window=60)
+
+    for user_id in (10, 11):
+        assert await middleware(handler, message(".ban 1", user_id, bot=bot), {}) == "handled"
+    assert await middleware(handler, message(".ban 1", 12, bot=bot), {}) is None
+    assert await middleware(handler, message(".ban 1", 12, chat_id=-2, bot=bot), {}) == "handled"
+
+
+@pytest.mark.asyncio
+async def test_plain_messages_are_not_counted():
+    middleware = ThrottlingMiddleware(user_limit=1, chat_limit=1, window=60)
+
+    for text in ("hello", ". spaced", ".", "hello"):
+        assert await middleware(handler, message(text), {}) == "handled"
+    assert await middleware(handler, message(".ban 1"), {}) == "handled"
+    assert middleware.dropped == 0
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from database import username_cache
+from database.username_cache import UsernameWriteBuffer
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_retries_without_new_entries(monkeypatch):
+    saved = []
+
+    async def upsert(batch):
+        if not saved:
+            saved.append(None)
+            raise RuntimeError("database is locked")
+        saved.append(dict(batch))
+
+    monkeypatch.setattr(username_cache.storage, "upsert_usernames", upsert)
+    buffer = UsernameWriteBuffer(interval=0.01, size=100)
+    buffer.add(10, ("u", None, None))
+
+    for _ in range(50):
+        if len(saved) == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert saved[1] == {10: ("u", None, None)}
+    assert buffer.pending == 0
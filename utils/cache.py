@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import (
+    BanChatMember,
+    PromoteChatMember,
+    RestrictChatMember,
+    TelegramMethod,
+    UnbanChatMember,
+)
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import ChatMember
+
+from config import MEMBER_CACHE_SIZE, MEMBER_CACHE_TTL, logger
+from utils.tracing import traced
+
+MemberKey = Tuple[int, int]  # (chat_id, user_id)
+
+# 호출 성공 시 대상 사용자의 멤버 상태가 바뀌는 메서드
+MEMBER_CHANGING_METHODS = (
+    BanChatMember,
+    UnbanChatMember,
+    RestrictChatMember,
+    PromoteChatMember,
+)
+
+
+class ChatMemberCache:
+    """(chat_id, user_id) → ChatMember TTL 캐시. 최대 maxsize개, LRU 순서로 제거."""
+
+    def __init__(self, ttl: float = MEMBER_CACHE_TTL, maxsize: int = MEMBER_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[MemberKey, Tuple[float, ChatMember]]" = OrderedDict()
+        self._inflight: Dict[MemberKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, chat_id: int, user_id: int) -> Optional[ChatMember]:
+        key = (chat_id, user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, member = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return member
+
+    def set(self, chat_id: int, user_id: int, member: ChatMember) -> None:
+        key = (chat_id, user_id)
+        self._entries[key] = (time.monotonic() + self.ttl, member)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, chat_id: int, user_id: int) -> None:
+        self._entries.pop((chat_id, user_id), None)
+
+    def invalidate_chat(self, chat_id: int) -> None:
+        """그룹의 모든 항목 제거 (봇 권한 변경, 그룹 탈퇴 등)."""
+        for key in [key for key in self._entries if key[0] == chat_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    async def fetch(self, bot: Bot, chat_id: int, user_id: int) -> ChatMember:
+        """캐시 조회 후 없으면 get_chat_member 호출. 동시 조회는 1회 호출로 합친다."""
+        member = self.get(chat_id, user_id)
+        if member is not None:
+            self.hits += 1
+            return member
+        key = (chat_id, user_id)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 먼저 조회하던 호출자가 취소된 경우에는 직접 다시 조회
+                if not inflight.cancelled():
+                    raise
+            return await self.fetch(bot, chat_id, user_id)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            member = await bot.get_chat_member(chat_id, user_id)
+        except asyncio.CancelledError:
+            # 대기 중인 다른 호출자가 멈추지 않도록 future도 취소
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 대기자가 없어도 "exception never retrieved" 경고가 나지 않도록
+            future.exception()
+            raise
+        else:
+            self.set(chat_id, user_id, member)
+            future.set_result(member)
+            return member
+        finally:
+            self._inflight.pop(key, None)
+
+
+class MemberCacheMiddleware(BaseRequestMiddleware):
+    """차단/해제/제한/승격 호출이 성공하면 대상 사용자의 캐시 항목을 무효화."""
+
+    def __init__(self, cache: ChatMemberCache):
+        self.cache = cache
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        response = await make_request(bot, method)
+        if isinstance(method, MEMBER_CHANGING_METHODS) and isinstance(
+            method.chat_id, int
+        ):
+            self.cache.invalidate(method.chat_id, method.user_id)
+        return response
+
+
+member_cache = ChatMemberCache()
+
+
+@traced("get_chat_member")
+async def get_chat_member(bot: Bot, chat_id: int, user_id: int) -> ChatMember:
+    """캐시를 거치는 bot.get_chat_member."""
+    return await member_cache.fetch(bot, chat_id, user_id)
+
+
+def log_member_cache_stats() -> None:
+    logger.info("member_cache_stats", **member_cache.stats())
@@ -1,18 +1,55 @@
+import re
+from datetime import timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 from aiogram import Bot, types
 
 from config import logger
-from database.username_cache import cache_username, get_user_id_from_cache
+from database.username_cache import cache_username, get_user_ids_from_cache
 
+# 기간 토큰: 7d, 12h, 1d12h, 30m, 2w
+DURATION_PATTERN = re.compile(r"(?:\d+[smhdw])+", re.IGNORECASE)
+DURATION_PART = re.compile(r"(\d+)([smhdw])", re.IGNORECASE)
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+# datetime 범위 초과 방지용 상한 (100년)
+DURATION_MAX_SECONDS = 100 * 365 * 86400
 
-async def extract_user_info(message: types.Message, bot: Bot) -> Dict[str, Any]:
-    """메시지에서 사용자 정보 추출."""
+
+def parse_duration(token: str) -> Optional[timedelta]:
+    """기간 토큰을 timedelta로 변환. 형식이 아니거나 0이면 None."""
+    if not DURATION_PATTERN.fullmatch(token):
+        return None
+    seconds = sum(
+        int(amount) * DURATION_UNITS[unit.lower()]
+        for amount, unit in DURATION_PART.findall(token)
+    )
+    return timedelta(seconds=min(seconds, DURATION_MAX_SECONDS)) if seconds else None
+
+
+def _split_duration(args: List[str], user_info: Dict[str, Any]) -> List[str]:
+    """맨 앞 기간 토큰만 duration으로 옮기고 나머지(사유)를 반환. 이후 토큰은 모두 사유."""
+    if args:
+        duration = parse_duration(args[0])
+        if duration:
+            user_info["duration"] = duration
+            args = args[1:]
+    return args
+
+
+async def extract_user_info(
+    message: types.Message, bot: Bot, with_duration: bool = False
+) -> Dict[str, Any]:
+    """메시지에서 사용자 정보 추출.
+
+    with_duration이면 대상 바로 뒤(답장이면 명령 바로 뒤)의 기간 토큰을 duration으로
+    읽는다 (.ban 123 7d 사유). 답장에서는 이때만 명령 뒤의 사유도 읽는다.
+    """
     user_info: Dict[str, Any] = {
         "user_id": 0,
         "username": "",
         "reason": "",
         "user_ids": [],
+        "duration": None,
     }
 
     try:
@@ -28,7 +65,10 @@ async def extract_user_info(message: types.Message, bot: Bot) -> Dict[str, Any]:
                 user_info["username"] = (
                     f"<b>{full_name}</b>" if full_name else "<b>Nickname</b>"
                 )
-            await cache_username(user.id, user_info["username"])
+            await cache_username(user.id, user.username, user.first_name, user.last_name)
+            if with_duration and message.text:
+                args = _split_duration(message.text.split()[1:], user_info)
+                user_info["reason"] = " ".join(args)
 
         # 텍스트 인자 처리
         elif message.text:
@@ -38,21 +78,29 @@ async def extract_user_info(message: types.Message, bot: Bot) -> Dict[str, Any]:
                 reason_start = 0
 
                 # 사용자 ID 또는 사용자명 처리
+                targets: List[str] = []
                 for arg in args:
+                    if not (arg.isdigit() or arg.startswith("@")):
+                        break
+                    targets.append(arg)
+                    reason_start += 1
+
+                # 사용자명은 한 번에 조회
+                usernames = [arg for arg in targets if arg.startswith("@")]
+                resolved = await get_user_ids_from_cache(usernames) if usernames else {}
+                for arg in targets:
                     if arg.isdigit():
                         user_info["user_ids"].append(int(arg))
-                        reason_start += 1
-                    elif arg.startswith("@"):
-                        user_id = await get_user_id_from_cache(arg)
+                    else:
+                        user_id = resolved.get(arg.lstrip("@").lower())
                         if user_id:
                             user_info["user_ids"].append(user_id)
-                        reason_start += 1
-                    else:
-                        break
 
-                # 사유 추출
-                if reason_start < len(args):
-                    user_info["reason"] = " ".join(args[reason_start:])
+                # 사유 추출 (기간 차단 명령은 대상 바로 뒤의 기간 토큰 먼저)
+                rest = args[reason_start:]
+                if with_duration:
+                    rest = _split_duration(rest, user_info)
+                user_info["reason"] = " ".join(rest)
 
         return user_info
 
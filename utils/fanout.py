@@ -0,0 +1,142 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from aiogram import Bot
+
+from config import FANOUT_CONCURRENCY, FANOUT_PER_GROUP, logger
+from database.groups import is_muted
+from utils.metrics import FANOUT_CELLS
+from utils.retry import is_chat_level_error
+from utils.tracing import tracer
+
+Cell = Tuple[int, int]  # (group_id, user_id)
+User = Tuple[Optional[str], int]  # (username, user_id)
+
+
+@dataclass
+class FanoutResult:
+    """(그룹 × 사용자) 실행 결과. 셀별 반환값 또는 예외."""
+
+    values: Dict[Cell, Any] = field(default_factory=dict)
+    errors: Dict[Cell, BaseException] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> List[Cell]:
+        return list(self.values)
+
+    def failures(self) -> Dict[Cell, str]:
+        return {cell: str(error) for cell, error in self.errors.items()}
+
+    def by_group(self) -> Dict[int, Dict[int, Optional[str]]]:
+        """그룹별 {사용자: None(성공) 또는 오류 메시지}."""
+        groups: Dict[int, Dict[int, Optional[str]]] = {}
+        for group_id, user_id in self.values:
+            groups.setdefault(group_id, {})[user_id] = None
+        for (group_id, user_id), error in self.errors.items():
+            groups.setdefault(group_id, {})[user_id] = str(error)
+        return groups
+
+
+def build_matrix(group_ids: Iterable[int], user_ids: Sequence[int]) -> List[Cell]:
+    """사용자 우선 순서로 셀 생성 (동시 실행이 여러 그룹에 분산되도록)."""
+    groups = list(group_ids)
+    return [(group_id, user_id) for user_id in user_ids for group_id in groups]
+
+
+async def run_fanout(
+    cells: Iterable[Cell],
+    call: Callable[[int, int], Awaitable[Any]],
+    concurrency: int = FANOUT_CONCURRENCY,
+    per_group: int = FANOUT_PER_GROUP,
+) -> FanoutResult:
+    """셀마다 call(group_id, user_id) 실행. 전체 동시 실행 수와 그룹별 동시 실행 수 제한.
+
+    권한 부족 등 그룹 단위 오류가 나면 그 그룹의 남은 셀은 호출하지 않고 같은 오류로 기록.
+    """
+    result = FanoutResult()
+    pending = iter(list(cells))
+    group_slots: Dict[int, asyncio.Semaphore] = {}
+    aborted: Dict[int, BaseException] = {}
+
+    async def worker() -> None:
+        for cell in pending:
+            group_id, _ = cell
+            slot = group_slots.setdefault(group_id, asyncio.Semaphore(per_group))
+            async with slot:
+                if group_id in aborted:
+                    result.errors[cell] = aborted[group_id]
+                    continue
+                try:
+                    result.values[cell] = await call(*cell)
+                except Exception as e:
+                    result.errors[cell] = e
+                    if is_chat_level_error(e):
+                        aborted[group_id] = e
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return result
+
+
+async def sync_matrix(
+    bot: Bot,
+    action: str,
+    cells: List[Cell],
+    usernames: Dict[int, Optional[str]],
+    call: Callable[[int, int], Awaitable[Any]],
+    build_notification: Callable[[List[User], str, str], str],
+    reason: str,
+    origin_chat_title: str,
+    concurrency: int = FANOUT_CONCURRENCY,
+) -> FanoutResult:
+    """동작 매트릭스 실행 후 그룹마다 성공한 사용자에 대한 알림 1건 전송."""
+
+    async def traced_call(group_id: int, user_id: int) -> Any:
+        with tracer.span(f"sync.{action}", group_id=group_id, user_id=user_id):
+            return await call(group_id, user_id)
+
+    result = await run_fanout(cells, traced_call, concurrency)
+    FANOUT_CELLS.inc(len(result.values), action=action, result="success")
+    FANOUT_CELLS.inc(len(result.errors), action=action, result="failure")
+
+    for group_id, users in result.by_group().items():
+        failed = {user_id: error for user_id, error in users.items() if error}
+        if failed:
+            logger.error(
+                f"group_{action}_failed",
+                group_id=group_id,
+                user_ids=list(failed),
+                error=next(iter(failed.values())),
+            )
+
+    notify_groups: Dict[int, List[User]] = {}
+    for group_id, user_id in result.succeeded:
+        if not is_muted(group_id):
+            notify_groups.setdefault(group_id, []).append((usernames.get(user_id), user_id))
+
+    async def notify(group_id: int, _: int) -> None:
+        text = build_notification(notify_groups[group_id], reason, origin_chat_title)
+        try:
+            await bot.send_message(group_id, text, parse_mode="HTML")
+        except Exception as e:
+            logger.error(f"{action}_notification_failed", group_id=group_id, error=str(e))
+
+    await run_fanout([(group_id, 0) for group_id in notify_groups], notify, concurrency)
+    logger.info(
+        f"{action}_fanout_done",
+        cell_count=len(cells),
+        succeeded=len(result.values),
+        failed=len(result.errors),
+        notified_groups=len(notify_groups),
+    )
+    return result
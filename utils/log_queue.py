@@ -0,0 +1,96 @@
+"""로그 기록을 백그라운드 스레드로 넘기는 큐 기반 로깅 구성.
+
+config.py가 import 시 호출하므로 이 모듈은 config를 import하지 않는다.
+"""
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+
+class DroppingQueueHandler(QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 QueueHandler (버린 수 집계)."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class GzipRotatingFileHandler(RotatingFileHandler):
+    """크기 기준으로 회전하고, 회전된 파일은 .gz로 압축 (bot.log.1.gz ...)."""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int):
+        super().__init__(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = _gzip_rotator
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_queue_logging(
+    path: str,
+    level: int = logging.INFO,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    queue_size: int = 10000,
+    console: bool = True,
+) -> DroppingQueueHandler:
+    """루트 로거를 QueueHandler 하나로 교체하고 파일/콘솔 출력은 리스너 스레드에서 처리."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    formatter = logging.Formatter("%(message)s")
+    handlers: list = []
+    file_handler = GzipRotatingFileHandler(path, max_bytes, backup_count)
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return queue_handler
+
+
+def stop_queue_logging() -> None:
+    """남은 레코드를 모두 기록하고 리스너 스레드 종료."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(stop_queue_logging)
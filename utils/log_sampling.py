@@ -0,0 +1,96 @@
+"""이벤트 이름별 표본 추출/속도 제한 structlog processor.
+
+config.py가 import 시 사용하므로 이 모듈은 config를 import하지 않는다.
+"""
+import random
+import threading
+import time
+from typing import Any, Dict, MutableMapping, Optional, Tuple
+
+import structlog
+
+# 제한 대상 로그 레벨 (warning 이상은 항상 기록)
+LIMITED_METHODS = frozenset({"debug", "info"})
+SUPPRESSED_EVENT = "log_events_suppressed"
+
+
+def parse_event_budgets(spec: str) -> Dict[str, Tuple[str, float]]:
+    """'이벤트=5/s,이벤트=0.1' 형식 해석. N/s는 초당 N건, 0~1 사이 숫자는 표본 비율."""
+    budgets: Dict[str, Tuple[str, float]] = {}
+    for item in spec.split(","):
+        name, _, value = item.strip().partition("=")
+        name, value = name.strip(), value.strip().lower()
+        if not name or not value:
+            continue
+        if value.endswith("/s"):
+            budgets[name] = ("rate", float(value[:-2]))
+        else:
+            rate = float(value)
+            if not 0 <= rate <= 1:
+                raise ValueError(f"표본 비율은 0~1 사이여야 합니다: {item}")
+            budgets[name] = ("sample", rate)
+    return budgets
+
+
+class EventSampler:
+    """지정한 이벤트만 초당 건수(토큰 버킷) 또는 비율로 통과시키는 processor.
+
+    버린 건수는 이벤트별로 모아 report_interval초마다 log_events_suppressed 한 줄로 남긴다.
+    """
+
+    def __init__(
+        self, budgets: Dict[str, Tuple[str, float]], report_interval: float = 60.0
+    ):
+        self.budgets = budgets
+        self.report_interval = report_interval
+        # 이벤트 → (남은 토큰, 마지막 갱신 시각)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._last_report = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _allow(self, event: str, kind: str, value: float, now: float) -> bool:
+        if kind == "sample":
+            return random.random() < value
+        tokens, updated = self._buckets.get(event, (value, now))
+        tokens = min(value, tokens + (now - updated) * value)
+        if tokens >= 1:
+            self._buckets[event] = (tokens - 1, now)
+            return True
+        self._buckets[event] = (tokens, now)
+        return False
+
+    def __call__(
+        self, logger: Any, method_name: str, event_dict: MutableMapping[str, Any]
+    ) -> MutableMapping[str, Any]:
+        if method_name not in LIMITED_METHODS:
+            return event_dict
+        event = event_dict.get("event")
+        budget = self.budgets.get(event) if isinstance(event, str) else None
+        if budget is None and not self._suppressed:
+            return event_dict
+        now = time.monotonic()
+        report: Optional[Dict[str, int]] = None
+        with self._lock:
+            dropped = budget is not None and not self._allow(event, budget[0], budget[1], now)
+            if dropped:
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+            if self._suppressed and now - self._last_report >= self.report_interval:
+                report = self._take_report(now)
+        if report:
+            structlog.get_logger().info(SUPPRESSED_EVENT, counts=report)
+        if dropped:
+            raise structlog.DropEvent
+        return event_dict
+
+    def _take_report(self, now: float) -> Dict[str, int]:
+        report, self._suppressed = self._suppressed, {}
+        self._last_report = now
+        return report
+
+    def flush(self) -> None:
+        """모아 둔 억제 건수를 즉시 기록 (종료 시 호출)."""
+        with self._lock:
+            report = self._take_report(time.monotonic())
+        if report:
+            structlog.get_logger().info(SUPPRESSED_EVENT, counts=report)
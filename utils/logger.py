@@ -1,12 +1,183 @@
-from typing import List, Tuple, Optional
+import asyncio
+import re
+from typing import Dict, List, Optional, Set, Tuple
 
 from aiogram import Bot
-from aiogram.exceptions import TelegramAPIError
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
 
-from config import LOG_CHANNEL_ID, PUBLIC_LOG_CHANNEL_ID, logger
+from config import LOG_CHANNEL_ID, LOG_DIGEST_WINDOW, PUBLIC_LOG_CHANNEL_ID, logger
 from database.groups import get_notification_status
+from utils.tracing import detached_task, traced
 
+TELEGRAM_MESSAGE_LIMIT = 4096
+DIGEST_SEPARATOR = "\n\n"
+# HTML 토큰: 태그, 문자 참조, 그 외 한 글자
+HTML_TOKEN = re.compile(r"<(/?)([a-zA-Z-]*)[^>]*>|&#?\w+;|.", re.DOTALL)
+TRUNCATION_MARK = "…"
 
+
+def visible_length(html: str) -> int:
+    """태그를 빼고 문자 참조를 한 글자로 센 길이 (텔레그램 길이 제한 기준)."""
+    return sum(1 for match in HTML_TOKEN.finditer(html) if not match.group(0).startswith("<"))
+
+
+def truncate_html(html: str, limit: int) -> str:
+    """보이는 글자 limit자 이내로 자르고, 열린 태그는 닫는다 (태그/문자 참조 중간은 자르지 않음)."""
+    if visible_length(html) <= limit:
+        return html
+    parts: List[str] = []
+    open_tags: List[str] = []
+    visible = 0
+    for match in HTML_TOKEN.finditer(html):
+        token = match.group(0)
+        if token.startswith("<"):
+            closing, name = match.group(1), match.group(2).lower()
+            if closing:
+                if name in open_tags:
+                    open_tags.remove(name)
+            elif name:
+                open_tags.append(name)
+            parts.append(token)
+            continue
+        if visible >= limit - len(TRUNCATION_MARK):
+            break
+        parts.append(token)
+        visible += 1
+    parts.append(TRUNCATION_MARK)
+    parts.extend(f"</{name}>" for name in reversed(open_tags))
+    return "".join(parts)
+
+
+class LogDigest:
+    """채널별로 로그를 모아 window초 또는 4096자 단위로 한 번에 전송하는 버퍼."""
+
+    def __init__(
+        self, window: float = LOG_DIGEST_WINDOW, limit: int = TELEGRAM_MESSAGE_LIMIT
+    ):
+        self.window = window
+        self.limit = limit
+        self._bot: Optional[Bot] = None
+        self._buffers: Dict[int, List[str]] = {}
+        self._sizes: Dict[int, int] = {}
+        self._timers: Dict[int, asyncio.Task] = {}
+        self._sends: Set[asyncio.Task] = set()
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    @property
+    def pending(self) -> int:
+        """전송 대기 중인 로그 건수."""
+        return sum(len(entries) for entries in self._buffers.values())
+
+    def add(self, bot: Bot, channel_id: int, text: str) -> None:
+        """로그 1건을 버퍼에 추가. 크기 초과 시 즉시, 아니면 window 후 전송."""
+        self._bot = bot
+        text = truncate_html(text, self.limit)
+        if self.window <= 0:
+            self._spawn_send(channel_id, [text])
+            return
+        # 크기는 태그를 뺀 보이는 글자 수 기준
+        length = visible_length(text)
+        size = self._sizes.get(channel_id, 0)
+        if size and size + len(DIGEST_SEPARATOR) + length > self.limit:
+            self._flush_channel(channel_id)
+            size = 0
+        self._buffers.setdefault(channel_id, []).append(text)
+        self._sizes[channel_id] = size + (len(DIGEST_SEPARATOR) if size else 0) + length
+        if channel_id not in self._timers:
+            self._timers[channel_id] = detached_task(self._flush_later(channel_id))
+
+    async def _flush_later(self, channel_id: int) -> None:
+        await asyncio.sleep(self.window)
+        self._timers.pop(channel_id, None)
+        self._flush_channel(channel_id)
+
+    def _flush_channel(self, channel_id: int) -> None:
+        timer = self._timers.pop(channel_id, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        entries = self._buffers.pop(channel_id, [])
+        self._sizes.pop(channel_id, None)
+        if entries:
+            self._spawn_send(channel_id, entries)
+
+    def _spawn_send(self, channel_id: int, entries: List[str]) -> None:
+        task = detached_task(self._send(channel_id, entries))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _send(self, channel_id: int, entries: List[str]) -> None:
+        if self._bot is None:
+            return
+        digest = DIGEST_SEPARATOR.join(entries)
+        # 채널별 전송 순서 유지
+        async with self._locks.setdefault(channel_id, asyncio.Lock()):
+            try:
+                await self._bot.send_message(channel_id, digest, parse_mode="HTML")
+                logger.info(
+                    "log_sent",
+                    channel_id=channel_id,
+                    entry_count=len(entries),
+                    length=len(digest),
+                )
+            except TelegramBadRequest as e:
+                if len(entries) == 1:
+                    logger.error(
+                        "log_entry_dropped",
+                        channel_id=channel_id,
+                        error=str(e),
+                        text=entries[0][:200],
+                    )
+                    return
+                # 잘못된 HTML 한 건 때문에 묶음 전체를 잃지 않도록 한 건씩 다시 전송
+                logger.warning(
+                    "log_digest_split",
+                    channel_id=channel_id,
+                    entry_count=len(entries),
+                    error=str(e),
+                )
+                for entry in entries:
+                    await self._send_entry(channel_id, entry)
+            except TelegramAPIError as e:
+                logger.error(
+                    "log_digest_send_failed",
+                    channel_id=channel_id,
+                    entry_count=len(entries),
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+            except Exception as e:
+                logger.error(
+                    "log_digest_send_failed_unexpected",
+                    channel_id=channel_id,
+                    entry_count=len(entries),
+                    error=str(e),
+                )
+
+    async def _send_entry(self, channel_id: int, entry: str) -> None:
+        assert self._bot is not None
+        try:
+            await self._bot.send_message(channel_id, entry, parse_mode="HTML")
+        except TelegramAPIError as e:
+            logger.error(
+                "log_entry_dropped", channel_id=channel_id, error=str(e), text=entry[:200]
+            )
+
+    async def flush(self) -> None:
+        """버퍼에 남은 로그를 모두 전송하고 완료까지 대기."""
+        for channel_id in list(self._buffers):
+            self._flush_channel(channel_id)
+        if self._sends:
+            await asyncio.gather(*list(self._sends), return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.flush()
+        logger.info("log_digest_closed")
+
+
+log_digest = LogDigest()
+
+
+@traced("log_ban")
 async def log_ban(
     bot: Bot,
     users: List[Tuple[str, int]],
@@ -50,28 +221,10 @@ async def log_ban(
                 "log_ban_invalid_channel", channel_id=channel_id, chat_id=chat_id
             )
             continue
-        try:
-            await bot.send_message(channel_id, log_message, parse_mode="HTML")
-            logger.info(
-                "log_sent", channel_id=channel_id, chat_id=chat_id, message=log_message
-            )
-        except TelegramAPIError as e:
-            logger.error(
-                "log_ban_failed",
-                channel_id=channel_id,
-                chat_id=chat_id,
-                error=str(e),
-                error_type=type(e).__name__,
-                bot_id=bot.id,
-            )
-        except Exception as e:
-            logger.error(
-                "log_ban_failed_unexpected",
-                channel_id=chat_id,
-                error=str(e),
-            )
+        log_digest.add(bot, channel_id, log_message)
 
 
+@traced("log_kick")
 async def log_kick(
     bot: Bot,
     user_id: int,
@@ -98,31 +251,10 @@ async def log_kick(
         if not await get_notification_status(chat_id):
             logger.info("log_kick_skipped_muted", chat_id=chat_id)
             return
-        try:
-            await bot.send_message(LOG_CHANNEL_ID, log_message, parse_mode="HTML")
-            logger.info(
-                "log_sent",
-                channel_id=LOG_CHANNEL_ID,
-                chat_id=chat_id,
-                message=log_message,
-            )
-        except TelegramAPIError as e:
-            logger.error(
-                "log_kick_failed",
-                channel_id=LOG_CHANNEL_ID,
-                chat_id=chat_id,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-        except Exception as e:
-            logger.error(
-                "log_kick_failed_unexpected",
-                channel_id=LOG_CHANNEL_ID,
-                chat_id=chat_id,
-                error=str(e),
-            )
+        log_digest.add(bot, LOG_CHANNEL_ID, log_message)
 
 
+@traced("log_unban")
 async def log_unban(
     bot: Bot,
     user_id: int,
@@ -150,25 +282,7 @@ async def log_unban(
                 "log_unban_invalid_channel", channel_id=channel_id, chat_id=chat_id
             )
             continue
-        try:
-            await bot.send_message(channel_id, log_message, parse_mode="HTML")
-            logger.info(
-                "log_sent", channel_id=channel_id, chat_id=chat_id, message=log_message
-            )
-        except TelegramAPIError as e:
-            logger.error(
-                "log_unban_failed",
-                channel_id=channel_id,
-                chat_id=chat_id,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-        except Exception as e:
-            logger.error(
-                "log_unban_failed_unexpected",
-                channel_id=chat_id,
-                error=str(e),
-            )
+        log_digest.add(bot, channel_id, log_message)
 
 
 async def log_group_add(
@@ -191,25 +305,7 @@ async def log_group_add(
                 "log_group_add_invalid_channel", channel_id=channel_id, chat_id=chat_id
             )
             continue
-        try:
-            await bot.send_message(channel_id, log_message)
-            logger.info(
-                "log_sent", channel_id=channel_id, chat_id=chat_id, message=log_message
-            )
-        except TelegramAPIError as e:
-            logger.error(
-                "log_group_add_failed",
-                channel_id=channel_id,
-                chat_id=chat_id,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-        except Exception as e:
-            logger.error(
-                "log_group_add_failed_unexpected",
-                channel_id=chat_id,
-                error=str(e),
-            )
+        log_digest.add(bot, channel_id, log_message)
 
 
 async def log_group_remove(
@@ -234,25 +330,7 @@ async def log_group_remove(
                 chat_id=chat_id,
             )
             continue
-        try:
-            await bot.send_message(channel_id, log_message)
-            logger.info(
-                "log_sent", channel_id=channel_id, chat_id=chat_id, message=log_message
-            )
-        except TelegramAPIError as e:
-            logger.error(
-                "log_group_remove_failed",
-                channel_id=channel_id,
-                chat_id=chat_id,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-        except Exception as e:
-            logger.error(
-                "log_group_remove_failed_unexpected",
-                channel_id=chat_id,
-                error=str(e),
-            )
+        log_digest.add(bot, channel_id, log_message)
 
 
 async def log_admin_add(
@@ -266,22 +344,7 @@ async def log_admin_add(
     )
     logger.info("admin_add_log", target_id=target_id, admin_id=admin_id)
     if LOG_CHANNEL_ID:
-        try:
-            await bot.send_message(LOG_CHANNEL_ID, log_message)
-            logger.info("log_sent", channel_id=LOG_CHANNEL_ID, message=log_message)
-        except TelegramAPIError as e:
-            logger.error(
-                "log_admin_add_failed",
-                channel_id=LOG_CHANNEL_ID,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-        except Exception as e:
-            logger.error(
-                "log_admin_add_failed_unexpected",
-                channel_id=LOG_CHANNEL_ID,
-                error=str(e),
-            )
+        log_digest.add(bot, LOG_CHANNEL_ID, log_message)
 
 
 async def log_admin_remove(
@@ -295,22 +358,7 @@ async def log_admin_remove(
     )
     logger.info("admin_remove_log", target_id=target_id, admin_id=admin_id)
     if LOG_CHANNEL_ID:
-        try:
-            await bot.send_message(LOG_CHANNEL_ID, log_message)
-            logger.info("log_sent", channel_id=LOG_CHANNEL_ID, message=log_message)
-        except TelegramAPIError as e:
-            logger.error(
-                "log_admin_remove_failed",
-                channel_id=LOG_CHANNEL_ID,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-        except Exception as e:
-            logger.error(
-                "log_admin_remove_failed_unexpected",
-                channel_id=LOG_CHANNEL_ID,
-                error=str(e),
-            )
+        log_digest.add(bot, LOG_CHANNEL_ID, log_message)
 
 
 async def log_command(
@@ -338,28 +386,7 @@ async def log_command(
         chat_title=chat_title
     )
     if LOG_CHANNEL_ID:
-        try:
-            await bot.send_message(LOG_CHANNEL_ID, log_message, parse_mode="HTML")
-            logger.info(
-                "log_sent",
-                channel_id=LOG_CHANNEL_ID,
-                chat_id=chat_id,
-                message=log_message
-            )
-        except TelegramAPIError as e:
-            logger.error(
-                "log_command_failed",
-                channel_id=LOG_CHANNEL_ID,
-                chat_id=chat_id,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-        except Exception as e:
-            logger.error(
-                "log_command_failed_unexpected",
-                channel_id=chat_id,
-                error=str(e),
-            )
+        log_digest.add(bot, LOG_CHANNEL_ID, log_message)
 
 
 async def log_bot_added(
@@ -392,28 +419,7 @@ async def log_bot_added(
         chat_link=chat_link
     )
     if LOG_CHANNEL_ID:
-        try:
-            await bot.send_message(LOG_CHANNEL_ID, log_message, parse_mode="HTML")
-            logger.info(
-                "log_sent",
-                channel_id=LOG_CHANNEL_ID,
-                chat_id=chat_id,
-                message=log_message
-            )
-        except TelegramAPIError as e:
-            logger.error(
-                "log_bot_added_failed",
-                channel_id=LOG_CHANNEL_ID,
-                chat_id=chat_id,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-        except Exception as e:
-            logger.error(
-                "log_bot_added_failed_unexpected",
-                channel_id=chat_id,
-                error=str(e),
-            )
+        log_digest.add(bot, LOG_CHANNEL_ID, log_message)
 
 
 async def test_channel_access(bot, channel_id):
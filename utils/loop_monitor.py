@@ -0,0 +1,97 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from config import LOOP_LAG_INTERVAL, LOOP_LAG_THRESHOLD, logger
+from utils.metrics import registry
+
+LOOP_LAG = registry.histogram(
+    "okm3_event_loop_lag_seconds",
+    "Delay between a scheduled wake-up and the loop running it.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOOP_BLOCKS = registry.counter(
+    "okm3_event_loop_blocked_total", "Times the loop stalled longer than the threshold."
+)
+MAX_STACK_FRAMES = 30
+
+
+class LoopLagMonitor:
+    """이벤트 루프 지연 측정과 멈춤 감지.
+
+    루프 안의 probe가 interval초마다 깨어나 예정보다 늦은 만큼을 기록하고,
+    별도 감시 스레드는 probe가 threshold초 넘게 깨어나지 못하면 그 순간
+    루프 스레드의 스택(막고 있는 콜백)을 로그로 남긴다.
+    """
+
+    def __init__(
+        self, interval: float = LOOP_LAG_INTERVAL, threshold: float = LOOP_LAG_THRESHOLD
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self._beat = time.monotonic()
+        self._reported_beat = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info("loop_monitor_started", interval=self.interval, threshold=self.threshold)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled)
+            self._beat = time.monotonic()
+            LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                LOOP_BLOCKS.inc()
+                logger.warning("event_loop_lag", lag_ms=round(lag * 1000, 1))
+
+    def _watch(self) -> None:
+        limit = self.interval + self.threshold
+        while not self._stopped.wait(min(self.threshold, self.interval) / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled < limit or beat == self._reported_beat:
+                continue
+            # 멈춘 beat마다 한 번만 기록
+            self._reported_beat = beat
+            logger.warning(
+                "event_loop_blocked",
+                stalled_ms=round((stalled - self.interval) * 1000, 1),
+                stack=self._loop_stack(),
+            )
+
+    def _loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id or 0)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame, limit=MAX_STACK_FRAMES))
@@ -0,0 +1,334 @@
+import functools
+import inspect
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiohttp import web
+
+from config import logger
+
+LabelValues = Tuple[str, ...]
+GaugeCallback = Callable[[], Union[float, Awaitable[float]]]
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    @abstractmethod
+    async def render(self) -> List[str]:
+        """텍스트 노출 형식의 줄 목록."""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        # 라벨 없는 counter는 0부터 노출
+        self._values: Dict[LabelValues, float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    async def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """값을 직접 설정하거나, 수집 시점에 callback(동기/비동기)으로 읽는 게이지."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[GaugeCallback] = None,
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    async def render(self) -> List[str]:
+        if self.callback is not None:
+            try:
+                value = self.callback()
+                if inspect.isawaitable(value):
+                    value = await value
+            except Exception as e:
+                logger.error("metrics_callback_failed", metric=self.name, error=str(e))
+                return []
+            return self.header() + [f"{self.name} {_format_value(float(value))}"]
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # 라벨별 [버킷별 개수..., 합계]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0.0] * (len(self.buckets) + 1)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+                break
+        series[-1] += value
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    async def render(self) -> List[str]:
+        lines = self.header()
+        for key, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_format_value(cumulative)}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """이름으로 지표를 등록하고 텍스트 노출 형식으로 출력."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[GaugeCallback] = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def counter_callback(
+        self, name: str, documentation: str, callback: GaugeCallback
+    ) -> Gauge:
+        """다른 객체가 이미 세고 있는 누적값을 counter로 노출."""
+        return self._register(Gauge(name, documentation, callback=callback, kind="counter"))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    async def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(await metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HANDLER_DURATION = registry.histogram(
+    "okm3_handler_duration_seconds", "Handler execution time.", ["handler"]
+)
+HANDLER_ERRORS = registry.counter(
+    "okm3_handler_errors_total", "Handler calls that raised.", ["handler"]
+)
+API_DURATION = registry.histogram(
+    "okm3_bot_api_request_duration_seconds", "Bot API request time per attempt.", ["method"]
+)
+API_ERRORS = registry.counter(
+    "okm3_bot_api_errors_total", "Failed Bot API requests.", ["method", "error"]
+)
+DB_DURATION = registry.histogram(
+    "okm3_db_query_duration_seconds",
+    "SQLite statement time including connection wait.",
+    ["statement"],
+)
+FANOUT_CELLS = registry.counter(
+    "okm3_fanout_cells_total", "Cross-group (group, user) actions.", ["action", "result"]
+)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """비동기 함수 실행 시간을 handler 지표로 기록하는 데코레이터."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                HANDLER_ERRORS.inc(handler=name)
+                raise
+            finally:
+                HANDLER_DURATION.observe(time.perf_counter() - started, handler=name)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+UPDATE_CONFLICT_WORDS = frozenset({"OR", "REPLACE", "IGNORE", "ABORT", "ROLLBACK", "FAIL"})
+
+
+@functools.lru_cache(maxsize=512)
+def statement_label(query: str) -> str:
+    """SQL을 '동작 테이블' 라벨로 축약 (라벨 수 제한)."""
+    words = query.replace("(", " ").split()
+    if not words:
+        return "unknown"
+    verb = words[0].upper()
+    upper = [word.upper() for word in words]
+    if verb == "UPDATE":
+        rest = [word for word in words[1:] if word.upper() not in UPDATE_CONFLICT_WORDS]
+        return f"{verb} {rest[0]}" if rest else verb
+    for keyword in ("EXISTS", "FROM", "INTO", "TABLE", "INDEX"):
+        if keyword in upper[1:]:
+            index = upper.index(keyword, 1)
+            if index + 1 < len(words):
+                return f"{verb} {words[index + 1]}"
+    if verb == "PRAGMA" and len(words) > 1:
+        return f"PRAGMA {words[1].split('=')[0]}"
+    return verb
+
+
+class ApiMetricsMiddleware(BaseRequestMiddleware):
+    """Bot API 메서드별 요청 시간과 오류 수 기록."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = type(method).__name__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            API_ERRORS.inc(method=name, error=type(e).__name__)
+            raise
+        finally:
+            API_DURATION.observe(time.perf_counter() - started, method=name)
+
+
+async def _metrics_handler(request: web.Request) -> web.Response:
+    body = await registry.render()
+    return web.Response(
+        text=body, content_type="text/plain", charset="utf-8",
+        headers={"X-Content-Type-Options": "nosniff"},
+    )
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """/metrics 엔드포인트를 제공하는 aiohttp 서버 시작."""
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_handler)
+    runner = web.AppRunner(app, handle_signals=False, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("metrics_server_started", host=host, port=port)
+    return runner
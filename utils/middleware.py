@@ -1,12 +1,110 @@
-import asyncio
-from typing import Any, Callable, Dict, Awaitable
-from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject, Message
+import time
+from collections import OrderedDict, deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.filters import Command
+from aiogram.types import ChatMemberUpdated, TelegramObject, Message, User
 
-class ThrottlingMiddleware(BaseMiddleware):
-    def __init__(self, limit: float = 0.5):
+from config import (
+    HARVEST_MAX_WRITES_PER_SECOND,
+    THROTTLE_CHAT_LIMIT,
+    THROTTLE_MAX_KEYS,
+    THROTTLE_USER_LIMIT,
+    THROTTLE_WINDOW,
+    logger,
+)
+from database.username_cache import cache_username, profile_changed
+from utils.cache import ChatMemberCache
+from utils.metrics import HANDLER_DURATION, HANDLER_ERRORS
+from utils.tracing import annotate, tracer
+from utils.scheduler import TokenBucket
+
+class SlidingWindowLimiter:
+    """키별 최근 window초 동안 최대 limit회 허용. 비활성 키는 시간순으로 제거."""
+
+    def __init__(self, limit: int, window: float, max_keys: int = THROTTLE_MAX_KEYS):
         self.limit = limit
-        self.last_call: Dict[int, float] = {}
+        self.window = window
+        self.max_keys = max_keys
+        # 마지막 사용 순서로 정렬 (앞쪽이 가장 오래됨)
+        self._hits: "OrderedDict[int, Deque[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._hits:
+            key, hits = next(iter(self._hits.items()))
+            if hits[-1] > cutoff and len(self._hits) <= self.max_keys:
+                break
+            del self._hits[key]
+
+    def allowed(self, key: int, now: float) -> bool:
+        self._evict(now)
+        hits = self._hits.get(key)
+        if hits is None:
+            return True
+        cutoff = now - self.window
+        while hits and hits[0] <= cutoff:
+            hits.popleft()
+        return len(hits) < self.limit
+
+    def record(self, key: int, now: float) -> None:
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque(maxlen=self.limit)
+        hits.append(now)
+        self._hits.move_to_end(key)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """명령어 메시지에만 사용자별/채팅별 슬라이딩 윈도우 제한 적용.
+
+    초과한 명령은 조용히 버리고, 안내 메시지는 window마다 키별 1회만 보낸다.
+    """
+
+    def __init__(
+        self,
+        user_limit: int = THROTTLE_USER_LIMIT,
+        chat_limit: int = THROTTLE_CHAT_LIMIT,
+        window: float = THROTTLE_WINDOW,
+        prefix: str = ".",
+    ):
+        self.window = window
+        self.prefix = prefix
+        self.users = SlidingWindowLimiter(user_limit, window)
+        self.chats = SlidingWindowLimiter(chat_limit, window)
+        # (구분, id) → 안내 전송 시각. 삽입 순서 = 만료 순서
+        self._notified: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        self.dropped = 0
+
+    def is_command(self, message: Message) -> bool:
+        text = message.text or message.caption or ""
+        if not text.startswith(self.prefix) or len(text) <= len(self.prefix):
+            return False
+        return not text[len(self.prefix)].isspace()
+
+    def _should_notify(self, key: Tuple[str, int], now: float) -> bool:
+        cutoff = now - self.window
+        while self._notified and next(iter(self._notified.values())) <= cutoff:
+            self._notified.popitem(last=False)
+        if key in self._notified:
+            return False
+        self._notified[key] = now
+        return True
 
     async def __call__(
         self,
@@ -14,15 +112,197 @@ class ThrottlingMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any]
     ) -> Any:
-        if not isinstance(event, Message):
+        if not isinstance(event, Message) or not self.is_command(event):
             return await handler(event, data)
 
+        now = time.monotonic()
         user_id = event.from_user.id if event.from_user else None
-        if user_id:
-            current_time = asyncio.get_event_loop().time()
-            last_call_time = self.last_call.get(user_id, 0)
-            if current_time - last_call_time < self.limit:
+        chat_id = event.chat.id
+        blocked: Optional[Tuple[str, int]] = None
+        if user_id and not self.users.allowed(user_id, now):
+            blocked = ("user", user_id)
+        elif not self.chats.allowed(chat_id, now):
+            blocked = ("chat", chat_id)
+
+        if blocked is None:
+            if user_id:
+                self.users.record(user_id, now)
+            self.chats.record(chat_id, now)
+            return await handler(event, data)
+
+        self.dropped += 1
+        if self._should_notify(blocked, now):
+            logger.warning(
+                "command_throttled", scope=blocked[0], key=blocked[1], chat_id=chat_id
+            )
+            try:
                 await event.answer("너무 빠르게 요청하고 있습니다. 잠시 기다려 주세요.")
-                return None
-            self.last_call[user_id] = current_time
+            except Exception as e:
+                logger.error("throttle_notice_failed", chat_id=chat_id, error=str(e))
+        return None
+
+
+class ChatMemberUpdateMiddleware(BaseMiddleware):
+    """chat_member/my_chat_member 업데이트로 멤버 캐시를 최신 상태로 유지."""
+
+    def __init__(self, cache: ChatMemberCache):
+        self.cache = cache
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if isinstance(event, ChatMemberUpdated):
+            member = event.new_chat_member
+            if member.status in ("left", "kicked") and member.user.id == data["bot"].id:
+                # 봇이 그룹에서 나가면 해당 그룹 항목 전체 폐기
+                self.cache.invalidate_chat(event.chat.id)
+            else:
+                self.cache.set(event.chat.id, member.user.id, member)
         return await handler(event, data)
+
+
+class UserHarvestMiddleware(BaseMiddleware):
+    """메시지와 chat_member 업데이트에서 사용자 ID/사용자명/이름을 수집해 캐시에 기록.
+
+    변경된 프로필만 저장하며, 초당 max_writes건을 넘는 변경은 버리고 다음에 다시 본다.
+    """
+
+    def __init__(self, max_writes: float = HARVEST_MAX_WRITES_PER_SECOND):
+        self._bucket = TokenBucket(max_writes, max_writes)
+        self.recorded = 0
+        self.dropped = 0
+
+    @staticmethod
+    def _users(event: TelegramObject) -> List[User]:
+        if isinstance(event, Message):
+            users = [event.from_user]
+            if event.reply_to_message:
+                users.append(event.reply_to_message.from_user)
+            users.extend(event.new_chat_members or [])
+            return [user for user in users if user]
+        if isinstance(event, ChatMemberUpdated):
+            return [event.from_user, event.new_chat_member.user]
+        return []
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        try:
+            for user in self._users(event):
+                if user.is_bot or not profile_changed(
+                    user.id, user.username, user.first_name, user.last_name
+                ):
+                    continue
+                if self._bucket.try_acquire():
+                    self.dropped += 1
+                    continue
+                await cache_username(user.id, user.username, user.first_name, user.last_name)
+                self.recorded += 1
+        except Exception as e:
+            logger.error("user_harvest_failed", error=str(e))
+        return await handler(event, data)
+
+
+class CommandPrefilterMiddleware(BaseMiddleware):
+    """등록된 명령어가 아닌 메시지는 이후 미들웨어와 라우터 탐색 없이 종료.
+
+    접두사별 명령어 집합을 한 번 만들어 두고 메시지 첫 토큰을 조회한다.
+    """
+
+    def __init__(self, commands: Dict[str, FrozenSet[str]]):
+        self.commands = commands
+        self.passed = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_router(cls, router: Router) -> Optional["CommandPrefilterMiddleware"]:
+        """라우터의 message 핸들러에서 Command 필터를 수집.
+
+        명령어 필터가 없는 핸들러나 정규식 명령어가 있으면 거를 수 없으므로 None.
+        """
+        commands: Dict[str, Set[str]] = {}
+        for sub_router in router.chain_tail:
+            for handler in sub_router.message.handlers:
+                command_filters = [
+                    f.callback for f in handler.filters or [] if isinstance(f.callback, Command)
+                ]
+                if not command_filters:
+                    return None
+                for command_filter in command_filters:
+                    for name in command_filter.commands:
+                        if not isinstance(name, str):
+                            return None
+                        for prefix in command_filter.prefix:
+                            commands.setdefault(prefix, set()).add(name.lower())
+        return cls({prefix: frozenset(names) for prefix, names in commands.items()})
+
+    def is_command(self, message: Message) -> bool:
+        text = message.text or message.caption
+        if not text:
+            return False
+        names = self.commands.get(text[0])
+        if names is None:
+            return False
+        token = text.split(maxsplit=1)[0] if not text[1:2].isspace() else ""
+        return token[1:].partition("@")[0].lower() in names
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if isinstance(event, Message) and not self.is_command(event):
+            self.skipped += 1
+            return UNHANDLED
+        self.passed += 1
+        return await handler(event, data)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """핸들러 함수 이름별 실행 시간과 예외 수 기록 (inner 미들웨어로 등록)."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", "unknown")
+        annotate(handler=name)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(handler=name)
+            raise
+        finally:
+            HANDLER_DURATION.observe(time.perf_counter() - started, handler=name)
+
+
+class TracingMiddleware(BaseMiddleware):
+    """명령어 업데이트마다 루트 span을 열어 처리 전체를 하나의 trace로 기록."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, Message):
+            return await handler(event, data)
+        text = event.text or event.caption or ""
+        with tracer.root(
+            "command",
+            command=text.split(maxsplit=1)[0][:32] if text.strip() else "",
+            chat_id=event.chat.id,
+            user_id=event.from_user.id if event.from_user else None,
+        ):
+            return await handler(event, data)
@@ -1,6 +1,7 @@
 from aiogram import Bot
 from aiogram.types import ChatMember, ChatMemberOwner, ChatMemberAdministrator
 from config import MASTER_ADMIN_IDS, logger
+from utils.cache import get_chat_member
 
 async def is_admin(user_id: int) -> bool:
     """사용자가 마스터 관리자인지 확인."""
@@ -15,7 +16,7 @@ async def is_admin(user_id: int) -> bool:
 async def is_group_admin(bot: Bot, chat_id: int, user_id: int) -> bool:
     """사용자가 그룹 관리자인지 확인."""
     try:
-        chat_member = await bot.get_chat_member(chat_id, user_id)
+        chat_member = await get_chat_member(bot, chat_id, user_id)
         result = isinstance(chat_member, (ChatMemberOwner, ChatMemberAdministrator))
         logger.info(
             "is_group_admin_check",
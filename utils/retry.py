@@ -0,0 +1,153 @@
+import asyncio
+import random
+from typing import Any, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramEntityTooLarge,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+    TelegramServerError,
+    TelegramUnauthorizedError,
+)
+from aiogram.methods import (
+    BanChatMember,
+    PromoteChatMember,
+    RestrictChatMember,
+    TelegramMethod,
+    UnbanChatMember,
+)
+from aiogram.methods.base import Response, TelegramType
+
+from config import (
+    API_RETRY_ATTEMPTS,
+    API_RETRY_BASE_DELAY,
+    API_RETRY_MAX_DELAY,
+    logger,
+)
+from utils.scheduler import UNTHROTTLED_METHODS, ApiScheduler
+
+ERROR_RETRY_AFTER = "retry_after"
+ERROR_TRANSIENT = "transient"
+ERROR_PERMANENT = "permanent"
+
+# 그룹 단위로 실패하는 오류 (남은 사용자도 모두 실패하므로 즉시 중단)
+CHAT_LEVEL_ERROR_MARKERS = (
+    "not enough rights",
+    "chat not found",
+    "bot is not a member",
+    "bot was kicked",
+    "need administrator rights",
+    "chat_admin_required",
+)
+
+# 다시 보내도 결과가 같은 메서드 (조회 메서드는 이름으로 판별)
+IDEMPOTENT_METHODS = (BanChatMember, UnbanChatMember, RestrictChatMember, PromoteChatMember)
+
+
+def is_idempotent(method: TelegramMethod[Any]) -> bool:
+    return isinstance(method, IDEMPOTENT_METHODS) or type(method).__name__.startswith("Get")
+
+
+def classify_error(error: BaseException) -> str:
+    """Bot API 오류를 재시도 가능 여부로 분류."""
+    if isinstance(error, TelegramRetryAfter):
+        return ERROR_RETRY_AFTER
+    if isinstance(error, TelegramEntityTooLarge):
+        return ERROR_PERMANENT
+    if isinstance(error, (TelegramNetworkError, TelegramServerError, asyncio.TimeoutError)):
+        return ERROR_TRANSIENT
+    return ERROR_PERMANENT
+
+
+def is_chat_level_error(error: BaseException) -> bool:
+    """권한 부족 등 그룹 전체에 해당하는 영구 오류 여부."""
+    if isinstance(error, (TelegramForbiddenError, TelegramUnauthorizedError)):
+        return True
+    if isinstance(error, (TelegramBadRequest, TelegramNotFound)):
+        text = str(error).lower()
+        return any(marker in text for marker in CHAT_LEVEL_ERROR_MARKERS)
+    return False
+
+
+def is_retryable(method: TelegramMethod[Any], error: BaseException) -> bool:
+    """재시도해도 중복 실행 위험이 없는 오류인지 여부."""
+    if isinstance(error, (TelegramRetryAfter, TelegramServerError)):
+        return True
+    return is_idempotent(method)
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = API_RETRY_BASE_DELAY,
+    cap: float = API_RETRY_MAX_DELAY,
+) -> float:
+    """상한이 있는 지수 백오프 (full jitter)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RetryMiddleware(BaseRequestMiddleware):
+    """RetryAfter와 일시적 오류를 재시도하는 세션 미들웨어.
+
+    네트워크 오류/시간 초과는 이미 전달됐을 수 있으므로 멱등 메서드만 재시도하고,
+    메시지 전송 등은 RetryAfter와 서버 오류만 재시도한다.
+    RateLimitMiddleware보다 먼저 등록해야 재시도마다 예산을 다시 소모한다.
+    """
+
+    def __init__(
+        self,
+        scheduler: Optional[ApiScheduler] = None,
+        attempts: int = API_RETRY_ATTEMPTS,
+    ):
+        self.scheduler = scheduler
+        self.attempts = attempts
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if isinstance(method, UNTHROTTLED_METHODS):
+            return await make_request(bot, method)
+
+        attempt = 0
+        while True:
+            try:
+                return await make_request(bot, method)
+            except Exception as e:
+                kind = classify_error(e)
+                attempt += 1
+                if (
+                    kind == ERROR_PERMANENT
+                    or attempt >= self.attempts
+                    or not is_retryable(method, e)
+                ):
+                    raise
+                if isinstance(e, TelegramRetryAfter):
+                    delay = float(e.retry_after)
+                    if self.scheduler is not None:
+                        # 특정 채팅의 429는 그 채팅만, 채팅 없는 429는 전역으로 중지
+                        chat_id = getattr(method, "chat_id", None)
+                        self.scheduler.pause(
+                            delay, chat_id if isinstance(chat_id, int) else None
+                        )
+                else:
+                    delay = backoff_delay(attempt - 1)
+                logger.warning(
+                    "api_call_retry",
+                    method=type(method).__name__,
+                    chat_id=getattr(method, "chat_id", None),
+                    attempt=attempt,
+                    delay=round(delay, 2),
+                    error_kind=kind,
+                    error=str(e),
+                )
+                await asyncio.sleep(delay)
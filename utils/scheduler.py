@@ -0,0 +1,238 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import (
+    BanChatMember,
+    DeleteWebhook,
+    GetChatMember,
+    GetMe,
+    GetUpdates,
+    RestrictChatMember,
+    SetWebhook,
+    TelegramMethod,
+    UnbanChatMember,
+)
+from aiogram.methods.base import Response, TelegramType
+
+from config import (
+    API_CHAT_BURST,
+    API_CHAT_RATE,
+    API_GLOBAL_BURST,
+    API_GLOBAL_RATE,
+    LOG_CHANNEL_ID,
+    PUBLIC_LOG_CHANNEL_ID,
+    logger,
+)
+
+# 우선순위 (낮을수록 먼저)
+PRIORITY_MODERATION = 0
+PRIORITY_NOTIFICATION = 1
+PRIORITY_LOG = 2
+
+MODERATION_METHODS = (BanChatMember, UnbanChatMember, RestrictChatMember, GetChatMember)
+# 롱 폴링/웹훅 관리 요청은 예산에서 제외
+UNTHROTTLED_METHODS = (GetUpdates, GetMe, SetWebhook, DeleteWebhook)
+
+MAX_CHAT_BUCKETS = 10000
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """토큰 1개 획득 시도. 성공 시 0, 실패 시 다음 토큰까지 대기 시간(초)."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class ApiScheduler:
+    """전역/채팅별 토큰 버킷과 우선순위 큐로 Bot API 호출 속도를 제어."""
+
+    def __init__(
+        self,
+        global_rate: float = API_GLOBAL_RATE,
+        global_burst: float = API_GLOBAL_BURST,
+        chat_rate: float = API_CHAT_RATE,
+        chat_burst: float = API_CHAT_BURST,
+    ):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self._global = TokenBucket(global_rate, global_burst)
+        self._chat_buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._paused_until = 0.0
+        # 채팅별 flood 제한(429) 해제 시각
+        self._chat_paused_until: Dict[int, float] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def pause(self, seconds: float, chat_id: Optional[int] = None) -> None:
+        """flood 제한(429) 시 일정 시간 중지. chat_id가 있으면 그 채팅만, 없으면 전역."""
+        until = time.monotonic() + seconds
+        if chat_id is None:
+            self._paused_until = max(self._paused_until, until)
+            return
+        self._chat_paused_until[chat_id] = max(self._chat_paused_until.get(chat_id, 0.0), until)
+        if len(self._chat_paused_until) > MAX_CHAT_BUCKETS:
+            now = time.monotonic()
+            for key in [k for k, v in self._chat_paused_until.items() if v <= now]:
+                del self._chat_paused_until[key]
+
+    async def wait_chat(self, chat_id: int) -> None:
+        """채팅별 중지가 끝날 때까지 대기 (대기 중 연장되면 다시 대기)."""
+        while True:
+            until = self._chat_paused_until.get(chat_id)
+            if until is None:
+                return
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                self._chat_paused_until.pop(chat_id, None)
+                return
+            await asyncio.sleep(remaining)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+            if len(self._chat_buckets) > MAX_CHAT_BUCKETS:
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch())
+            logger.info(
+                "api_scheduler_started",
+                global_rate=self._global.rate,
+                chat_rate=self.chat_rate,
+            )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # 대기 중인 호출은 속도 제한 없이 풀어준다.
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+        logger.info("api_scheduler_stopped")
+
+    async def acquire(self, priority: int, chat_id: Optional[int] = None) -> None:
+        """호출 1회 분량의 예산 확보. chat_id가 주어지면 채팅별 예산도 소모."""
+        if chat_id is not None:
+            await self._chat_bucket(chat_id).acquire()
+        if self._task is None:
+            await self._global.acquire()
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), future))
+        self._wakeup.set()
+        await future
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            paused = self._paused_until - time.monotonic()
+            if paused > 0:
+                await asyncio.sleep(paused)
+                continue
+            wait = self._global.try_acquire()
+            if wait:
+                await asyncio.sleep(wait)
+                continue
+            while self._queue:
+                _, _, future = heapq.heappop(self._queue)
+                if not future.done():
+                    future.set_result(None)
+                    break
+            else:
+                # 대기자가 모두 취소된 경우 토큰 반환
+                self._global.refund()
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """모든 Bot API 요청을 ApiScheduler에 통과시키는 세션 미들웨어."""
+
+    def __init__(self, scheduler: ApiScheduler):
+        self.scheduler = scheduler
+        self.log_channel_ids = {LOG_CHANNEL_ID, PUBLIC_LOG_CHANNEL_ID}
+
+    def classify(self, method: TelegramMethod[Any]) -> Optional[int]:
+        if isinstance(method, UNTHROTTLED_METHODS):
+            return None
+        if isinstance(method, MODERATION_METHODS):
+            return PRIORITY_MODERATION
+        if getattr(method, "chat_id", None) in self.log_channel_ids:
+            return PRIORITY_LOG
+        return PRIORITY_NOTIFICATION
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        priority = self.classify(method)
+        if priority is not None:
+            chat_id = getattr(method, "chat_id", None)
+            if isinstance(chat_id, int):
+                # 429를 받은 채팅은 그 채팅으로 가는 호출만 멈춘다
+                await self.scheduler.wait_chat(chat_id)
+            # 채팅별 예산은 메시지 전송에만 적용 (텔레그램 그룹 메시지 한도)
+            if priority == PRIORITY_MODERATION or not isinstance(chat_id, int):
+                chat_id = None
+            await self.scheduler.acquire(priority, chat_id)
+        return await make_request(bot, method)
+
+
+api_scheduler = ApiScheduler()
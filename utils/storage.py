@@ -1,28 +1,19 @@
-from typing import Any, Dict, List, Optional, Tuple
-
-import aiosqlite
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from config import logger
-
-DATABASE = "data/bot.db"
+from database.connection import db
 
 
 async def execute_query(query: str, params: tuple = ()) -> None:
-    async with aiosqlite.connect(DATABASE) as conn:
-        await conn.execute(query, params)
-        await conn.commit()
+    await db.execute(query, params)
 
 
 async def fetch_query(query: str, params: tuple = ()) -> List[Tuple[Any, ...]]:
-    async with aiosqlite.connect(DATABASE) as conn:
-        cursor = await conn.execute(query, params)
-        rows = await cursor.fetchall()
-        return [
-            tuple(row) for row in rows
-        ]  # Iterable[Row]를 List[Tuple[Any, ...]]로 변환
+    return await db.fetchall(query, params)
 
 
-async def load_groups() -> Dict[str, Dict]:
+async def load_groups() -> Dict[int, Dict]:
     try:
         rows = await fetch_query(
             "SELECT chat_id, title, added_by, added_at, notification FROM groups"
@@ -41,27 +32,53 @@ async def load_groups() -> Dict[str, Dict]:
         return {}
 
 
-async def save_groups(groups: Dict[str, Dict]) -> None:
-    try:
-        for chat_id, data in groups.items():
-            await execute_query(
-                "INSERT OR REPLACE INTO groups (chat_id, title, added_by, added_at, notification) VALUES (?, ?, ?, ?, ?)",
-                (
-                    chat_id,
-                    data.get("title", ""),
-                    data.get("admin_id", 0),
-                    data.get("added_at", ""),
-                    not data.get("muted", False),
-                ),
+async def upsert_groups(groups: Dict[int, Dict]) -> None:
+    """변경된 그룹 행만 단일 트랜잭션으로 저장."""
+    if not groups:
+        return
+    await db.executemany(
+        "INSERT OR REPLACE INTO groups (chat_id, title, added_by, added_at, notification) VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                chat_id,
+                data.get("title", ""),
+                data.get("admin_id", 0),
+                data.get("added_at", ""),
+                not data.get("muted", False),
             )
+            for chat_id, data in groups.items()
+        ),
+    )
+
+
+async def update_groups_muted(chat_ids: Iterable[int], muted: bool) -> None:
+    """여러 그룹의 음소거 상태를 단일 트랜잭션으로 변경. 없는 그룹은 생성."""
+    await db.executemany(
+        "INSERT INTO groups (chat_id, title, added_by, added_at, notification) VALUES (?, '', 0, '', ?) "
+        "ON CONFLICT(chat_id) DO UPDATE SET notification = excluded.notification",
+        ((chat_id, not muted) for chat_id in chat_ids),
+    )
+
+
+async def delete_groups(chat_ids: Iterable[int]) -> None:
+    """여러 그룹을 단일 트랜잭션으로 삭제."""
+    await db.executemany(
+        "DELETE FROM groups WHERE chat_id = ?",
+        ((chat_id,) for chat_id in chat_ids),
+    )
+
+
+async def save_groups(groups: Dict[int, Dict]) -> None:
+    try:
+        await upsert_groups(groups)
     except Exception as e:
         logger.error("save_groups_failed", error=str(e))
 
 
-async def load_banned_users() -> Dict[str, Dict]:
+async def load_banned_users() -> Dict[int, Dict]:
     try:
         rows = await fetch_query(
-            "SELECT user_id, username, admin_id, admin_username, reason, chat_id FROM banned_users"
+            "SELECT user_id, username, admin_id, admin_username, reason, chat_id, expires_at FROM banned_users"
         )
         return {
             row[0]: {
@@ -70,6 +87,7 @@ async def load_banned_users() -> Dict[str, Dict]:
                 "admin_username": row[3],
                 "reason": row[4],
                 "chat_id": row[5],
+                "expires_at": row[6],
             }
             for row in rows
         }
@@ -78,26 +96,105 @@ async def load_banned_users() -> Dict[str, Dict]:
         return {}
 
 
-async def save_banned_users(users: Dict[str, Dict]) -> None:
-    try:
-        for user_id, data in users.items():
-            await execute_query(
-                "INSERT OR REPLACE INTO banned_users (user_id, username, admin_id, admin_username, reason, chat_id, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (
-                    user_id,
-                    data.get("username", ""),
-                    data.get("admin_id", 0),
-                    data.get("admin_username", ""),
-                    data.get("reason", ""),
-                    data.get("chat_id", 0),
-                    data.get("timestamp", ""),
-                ),
+async def upsert_banned_users(users: Dict[int, Dict]) -> None:
+    """변경된 차단 사용자 행만 단일 트랜잭션으로 저장."""
+    if not users:
+        return
+    await db.executemany(
+        "INSERT OR REPLACE INTO banned_users (user_id, username, admin_id, admin_username, reason, chat_id, timestamp, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                user_id,
+                data.get("username", ""),
+                data.get("admin_id", 0),
+                data.get("admin_username", ""),
+                data.get("reason", ""),
+                data.get("chat_id", 0),
+                data.get("timestamp", ""),
+                data.get("expires_at"),
             )
+            for user_id, data in users.items()
+        ),
+    )
+
+
+async def load_upcoming_ban_expiries(limit: int) -> List[Tuple[str, int]]:
+    """만료 시각이 가장 이른 기간 차단 limit건 (expires_at, user_id)."""
+    rows = await fetch_query(
+        "SELECT expires_at, user_id FROM banned_users WHERE expires_at IS NOT NULL "
+        "ORDER BY expires_at LIMIT ?",
+        (limit,),
+    )
+    return [(row[0], row[1]) for row in rows]
+
+
+async def load_expired_bans(now: str, limit: int) -> List[Dict[str, Any]]:
+    """만료 시각이 now 이전인 차단 기록."""
+    rows = await fetch_query(
+        "SELECT user_id, username, chat_id, expires_at FROM banned_users "
+        "WHERE expires_at IS NOT NULL AND expires_at <= ? ORDER BY expires_at LIMIT ?",
+        (now, limit),
+    )
+    return [
+        {"user_id": row[0], "username": row[1], "chat_id": row[2], "expires_at": row[3]}
+        for row in rows
+    ]
+
+
+async def expire_bans(bans: List[Tuple[int, str]], jobs: List[Dict[str, Any]]) -> None:
+    """만료 차단 삭제와 해제 연동 작업 기록을 한 트랜잭션으로 처리.
+
+    둘 사이에 종료되어 재시작 시 같은 해제 작업이 다시 기록되는 일을 막는다.
+    (user_id, expires_at)이 그대로인 차단만 삭제 (그 사이 다시 차단된 경우 유지).
+    """
+    async with db.transaction() as conn:
+        if jobs:
+            await conn.executemany(OUTBOX_INSERT, _outbox_rows(jobs))
+        await conn.executemany(
+            "DELETE FROM banned_users WHERE user_id = ? AND expires_at = ?", bans
+        )
+
+
+async def save_banned_users(users: Dict[int, Dict]) -> None:
+    try:
+        await upsert_banned_users(users)
     except Exception as e:
         logger.error("save_banned_users_failed", error=str(e))
 
 
-async def load_admins() -> Dict[str, Dict]:
+async def banned_user_exists(user_id: int) -> bool:
+    rows = await fetch_query(
+        "SELECT 1 FROM banned_users WHERE user_id = ? LIMIT 1", (user_id,)
+    )
+    return bool(rows)
+
+
+async def delete_banned_user(user_id: int) -> bool:
+    return await db.execute("DELETE FROM banned_users WHERE user_id = ?", (user_id,)) > 0
+
+
+async def upsert_kicked_users(users: Dict[int, Dict]) -> None:
+    """변경된 강퇴 사용자 행만 단일 트랜잭션으로 저장."""
+    if not users:
+        return
+    await db.executemany(
+        "INSERT OR REPLACE INTO kicked_users (user_id, username, admin_id, admin_username, reason, chat_id, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                user_id,
+                data.get("username", ""),
+                data.get("admin_id", 0),
+                data.get("admin_username", ""),
+                data.get("reason", ""),
+                data.get("chat_id", 0),
+                data.get("timestamp", ""),
+            )
+            for user_id, data in users.items()
+        ),
+    )
+
+
+async def load_admins() -> Dict[int, Dict]:
     try:
         rows = await fetch_query(
             "SELECT admin_id, username, added_by_id, added_by_username FROM admins"
@@ -115,41 +212,175 @@ async def load_admins() -> Dict[str, Dict]:
         return {}
 
 
-async def save_admins(admins: Dict[str, Dict]) -> None:
-    try:
-        for admin_id, data in admins.items():
-            await execute_query(
-                "INSERT OR REPLACE INTO admins (admin_id, username, added_by_id, added_by_username, timestamp) VALUES (?, ?, ?, ?, ?)",
-                (
-                    admin_id,
-                    data.get("username", ""),
-                    data.get("added_by", 0),
-                    data.get("added_by_username", ""),
-                    data.get("timestamp", ""),
-                ),
+async def upsert_admins(admins: Dict[int, Dict]) -> None:
+    """변경된 관리자 행만 단일 트랜잭션으로 저장."""
+    if not admins:
+        return
+    await db.executemany(
+        "INSERT OR REPLACE INTO admins (admin_id, username, added_by_id, added_by_username, timestamp) VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                admin_id,
+                data.get("username", ""),
+                data.get("added_by", 0),
+                data.get("added_by_username", ""),
+                data.get("timestamp", ""),
             )
-    except Exception as e:
-        logger.error("save_admins_failed", error=str(e))
+            for admin_id, data in admins.items()
+        ),
+    )
 
 
-async def cache_username(user_id: int, username: str) -> None:
+async def save_admins(admins: Dict[int, Dict]) -> None:
     try:
-        await execute_query(
-            "INSERT OR REPLACE INTO username_cache (user_id, username) VALUES (?, ?)",
-            (user_id, username),
-        )
-        logger.info("cache_username_success", user_id=user_id, username=username)
+        await upsert_admins(admins)
     except Exception as e:
-        logger.error("cache_username_failed", user_id=user_id, error=str(e))
+        logger.error("save_admins_failed", error=str(e))
+
+
+async def admin_exists(admin_id: int) -> bool:
+    rows = await fetch_query(
+        "SELECT 1 FROM admins WHERE admin_id = ? LIMIT 1", (admin_id,)
+    )
+    return bool(rows)
+
+
+async def delete_admin(admin_id: int) -> bool:
+    return await db.execute("DELETE FROM admins WHERE admin_id = ?", (admin_id,)) > 0
+
+
+async def upsert_usernames(
+    profiles: Dict[int, Tuple[Optional[str], Optional[str], Optional[str]]]
+) -> None:
+    """사용자명/이름 캐시 행을 단일 트랜잭션으로 저장."""
+    if not profiles:
+        return
+    await db.executemany(
+        "INSERT OR REPLACE INTO username_cache (user_id, username, first_name, last_name) VALUES (?, ?, ?, ?)",
+        ((user_id, *profile) for user_id, profile in profiles.items()),
+    )
 
 
 async def get_user_id_from_cache(username: str) -> Optional[int]:
     try:
         rows = await fetch_query(
-            "SELECT user_id FROM username_cache WHERE username = ?",
+            "SELECT user_id FROM username_cache WHERE username = ? COLLATE NOCASE LIMIT 1",
             (username.lstrip("@"),),
         )
         return int(rows[0][0]) if rows else None
     except Exception as e:
         logger.error("get_user_id_from_cache_failed", username=username, error=str(e))
         return None
+
+
+USERNAME_QUERY_CHUNK = 500
+
+
+async def get_user_ids_from_cache(usernames: Iterable[str]) -> Dict[str, int]:
+    """여러 사용자명을 한 번에 조회. 소문자 사용자명 → user_id."""
+    names = list(dict.fromkeys(name.lstrip("@").lower() for name in usernames))
+    result: Dict[str, int] = {}
+    try:
+        for start in range(0, len(names), USERNAME_QUERY_CHUNK):
+            chunk = names[start : start + USERNAME_QUERY_CHUNK]
+            rows = await fetch_query(
+                "SELECT username, user_id FROM username_cache "
+                f"WHERE username COLLATE NOCASE IN ({', '.join('?' * len(chunk))})",
+                tuple(chunk),
+            )
+            for username, user_id in rows:
+                result[username.lower()] = int(user_id)
+    except Exception as e:
+        logger.error("get_user_ids_from_cache_failed", count=len(names), error=str(e))
+    return result
+
+
+OUTBOX_COLUMNS = "id, batch_id, group_id, user_id, username, action, reason, origin_title, attempts"
+
+
+def outbox_timestamp(delay: float = 0.0) -> str:
+    """next_attempt_at 형식 (UTC ISO, 시간대 변경과 무관하게 문자열 비교 가능)."""
+    return (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+
+
+OUTBOX_INSERT = (
+    "INSERT INTO sync_outbox (batch_id, group_id, user_id, username, action, reason, origin_title, status, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?, ?)"
+)
+
+
+def _outbox_rows(jobs: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+    now = datetime.now().isoformat()
+    return [
+        (
+            job["batch_id"],
+            job["group_id"],
+            job["user_id"],
+            job.get("username", ""),
+            job["action"],
+            job.get("reason", ""),
+            job.get("origin_title", ""),
+            now,
+            now,
+        )
+        for job in jobs
+    ]
+
+
+async def insert_outbox_jobs(jobs: List[Dict[str, Any]]) -> None:
+    """연동 작업을 단일 트랜잭션으로 기록."""
+    await db.executemany(OUTBOX_INSERT, _outbox_rows(jobs))
+
+
+async def claim_outbox_jobs(limit: int) -> List[Dict[str, Any]]:
+    """재시도 시각이 된 대기 작업을 id 순으로 가져와 running으로 표시."""
+    rows = await fetch_query(
+        f"SELECT {OUTBOX_COLUMNS} FROM sync_outbox WHERE status = 'pending' "
+        "AND (next_attempt_at IS NULL OR next_attempt_at <= ?) ORDER BY id LIMIT ?",
+        (outbox_timestamp(), limit),
+    )
+    if not rows:
+        return []
+    await update_outbox_jobs([row[0] for row in rows], "running")
+    keys = [column.strip() for column in OUTBOX_COLUMNS.split(",")]
+    return [dict(zip(keys, row)) for row in rows]
+
+
+async def update_outbox_jobs(
+    job_ids: Iterable[int],
+    status: str,
+    error: Optional[str] = None,
+    increment_attempts: bool = False,
+    next_attempt_at: Optional[str] = None,
+) -> None:
+    """작업 상태 갱신. next_attempt_at은 pending 작업을 다시 가져갈 수 있는 시각 (UTC)."""
+    now = datetime.now().isoformat()
+    await db.executemany(
+        "UPDATE sync_outbox SET status = ?, error = ?, updated_at = ?, "
+        "attempts = attempts + ?, next_attempt_at = ? WHERE id = ?",
+        (
+            (status, error, now, int(increment_attempts), next_attempt_at, job_id)
+            for job_id in job_ids
+        ),
+    )
+
+
+async def reset_running_outbox_jobs() -> int:
+    """중단된 running 작업을 pending으로 되돌림 (재시작 시 재개)."""
+    return await db.execute(
+        "UPDATE sync_outbox SET status = 'pending' WHERE status = 'running'"
+    )
+
+
+async def purge_outbox_jobs(before: str) -> int:
+    """완료 후 보존 기간이 지난 작업 삭제."""
+    return await db.execute(
+        "DELETE FROM sync_outbox WHERE status = 'done' AND updated_at < ?", (before,)
+    )
+
+
+async def count_pending_outbox_jobs() -> int:
+    rows = await fetch_query(
+        "SELECT COUNT(*) FROM sync_outbox WHERE status IN ('pending', 'running')"
+    )
+    return int(rows[0][0]) if rows else 0
@@ -0,0 +1,281 @@
+import asyncio
+import functools
+import itertools
+import json
+import os
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+from config import (
+    TRACE_FILE,
+    TRACE_MAX_SPANS,
+    TRACE_SAMPLE_RATE,
+    TRACE_SLOW_MS,
+    logger,
+)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+T = TypeVar("T")
+
+
+class Trace:
+    """루트 span 하나에 딸린 span 목록. 최대 max_spans개만 보관."""
+
+    def __init__(self, name: str, max_spans: int):
+        self.trace_id = secrets.token_hex(8)
+        self.name = name
+        self.max_spans = max_spans
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def record(self, span: "Span") -> None:
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return
+        entry: Dict[str, Any] = {
+            "id": span.span_id,
+            "parent": span.parent_id,
+            "name": span.name,
+            "start_ms": round((span.start - self.origin) * 1000, 3),
+            "duration_ms": round(span.duration * 1000, 3),
+        }
+        if span.attributes:
+            entry["attrs"] = span.attributes
+        if span.error:
+            entry["error"] = span.error
+        self.spans.append(entry)
+
+
+class Span:
+    def __init__(
+        self, trace: Trace, name: str, parent_id: Optional[int], attributes: Dict[str, Any]
+    ):
+        self.trace = trace
+        self.span_id = trace.next_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start = time.perf_counter()
+        self.duration = 0.0
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+class Tracer:
+    """명령 단위 span 추적. 끝난 trace는 느린 것은 모두, 나머지는 sample_rate 비율로 JSONL 기록.
+
+    현재 span은 contextvar로 전달되므로 루트 span 안에서 만든 task에도 이어진다.
+    명령이 끝난 뒤에도 도는 백그라운드 task는 detached_task()로 만들어 분리한다.
+    """
+
+    def __init__(
+        self,
+        path: str = TRACE_FILE,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        slow_ms: float = TRACE_SLOW_MS,
+        max_spans: int = TRACE_MAX_SPANS,
+    ):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_spans = max_spans
+        self.exported = 0
+        self.discarded = 0
+        self._lines: List[str] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_ms > 0
+
+    @contextmanager
+    def root(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """새 trace의 루트 span. 이미 trace 안이면 자식 span으로 동작."""
+        if not self.enabled:
+            yield None
+            return
+        if _current.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+        trace = Trace(name, self.max_spans)
+        span: Optional[Span] = None
+        try:
+            with self._open(trace, name, None, attributes) as span:
+                yield span
+        finally:
+            if span is not None:
+                self._finish(trace, span)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """현재 trace의 자식 span. trace 밖이면 아무것도 기록하지 않는다."""
+        parent = _current.get()
+        if parent is None:
+            yield None
+            return
+        with self._open(parent.trace, name, parent.span_id, attributes) as span:
+            yield span
+
+    @contextmanager
+    def _open(
+        self, trace: Trace, name: str, parent_id: Optional[int], attributes: Dict[str, Any]
+    ) -> Iterator[Span]:
+        span = Span(trace, name, parent_id, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            _current.reset(token)
+            span.duration = time.perf_counter() - span.start
+            trace.record(span)
+
+    def _finish(self, trace: Trace, root: Span) -> None:
+        duration_ms = root.duration * 1000
+        slow = self.slow_ms > 0 and duration_ms >= self.slow_ms
+        if not slow and random.random() >= self.sample_rate:
+            self.discarded += 1
+            return
+        # 자식 span이 먼저 끝나므로 시작 시각 순으로 정렬
+        trace.spans.sort(key=lambda entry: entry["start_ms"])
+        self._lines.append(
+            json.dumps(
+                {
+                    "trace_id": trace.trace_id,
+                    "name": trace.name,
+                    "timestamp": trace.started_at,
+                    "duration_ms": round(duration_ms, 3),
+                    "slow": slow,
+                    "span_count": len(trace.spans) + trace.dropped_spans,
+                    "dropped_spans": trace.dropped_spans,
+                    "spans": trace.spans,
+                },
+                ensure_ascii=False,
+                default=str,
+            )
+        )
+        self.exported += 1
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        try:
+            while self._lines:
+                lines, self._lines = self._lines, []
+                try:
+                    await asyncio.to_thread(self._write, lines)
+                except Exception as e:
+                    logger.error("trace_export_failed", path=self.path, error=str(e))
+        finally:
+            self._writer = None
+
+    def _write(self, lines: List[str]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def close(self) -> None:
+        """기록 대기 중인 trace를 모두 파일에 쓴다."""
+        if self._writer is not None:
+            await asyncio.gather(self._writer, return_exceptions=True)
+        if self._lines:
+            await self._drain()
+        logger.info("tracer_closed", exported=self.exported, discarded=self.discarded)
+
+
+tracer = Tracer()
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """현재 span에 속성 추가 (trace 밖이면 무시)."""
+    span = _current.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """비동기 함수 호출을 현재 trace의 자식 span으로 기록하는 데코레이터."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def detached_task(coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+    """현재 trace와 분리된 task 생성.
+
+    task는 만들 때의 contextvar를 물려받으므로, 그대로 두면 이미 기록이 끝난 trace에
+    지연 전송/저장의 span이 붙는다.
+    """
+
+    context = copy_context()
+    context.run(_current.set, None)
+    # task는 생성 시점의 context를 복사하므로 span을 비운 context 안에서 만든다
+    return context.run(asyncio.create_task, coro)
+
+
+class TraceRequestMiddleware(BaseRequestMiddleware):
+    """Bot API 호출마다 자식 span 기록 (가장 바깥에 두면 대기/재시도 시간 포함)."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if _current.get() is None:
+            return await make_request(bot, method)
+        attributes = {}
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is not None:
+            attributes["chat_id"] = chat_id
+        with tracer.span(f"api.{type(method).__name__}", **attributes):
+            return await make_request(bot, method)